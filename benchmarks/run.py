@@ -0,0 +1,267 @@
+"""Benchmark the declaration, the registry initialization and the runtime hot paths
+of the extendable classes against an equivalent plain python class hierarchy.
+
+Run from the root of the repository::
+
+    python -m benchmarks.run --sizes 10,1000,10000 --output results.json
+    python -m benchmarks.run --compare results.json
+
+The results are written as a JSON document. When a previous result file is given
+with ``--compare``, the relative change of each measure is printed and the command
+exits with a non zero status if a measure regressed by more than ``--threshold``.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from extendable import ExtendableMeta, __version__, context, registry
+
+from .workload import Workload, isolated_declarations
+
+Result = Dict[str, Any]
+
+
+def measure(stmt: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Return the best duration of a call to ``stmt``, in nanoseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e9
+
+
+def declare(workload: Workload) -> float:
+    """Return the duration of the declaration of the classes, in seconds."""
+    codes = workload.compile()
+    gc.collect()
+    start = time.perf_counter()
+    workload.load(codes)
+    return time.perf_counter() - start
+
+
+SUPER_CLASS_SOURCE = """
+class Child(Root):
+    TABLE = TABLE
+
+    def compute(self):
+        return super().compute()
+
+    @property
+    def value(self):
+        return super().value
+
+    @classmethod
+    def from_row(cls, row):
+        return super().from_row(row)
+"""
+
+SUPER_ROOT_SOURCE = """
+class Root({bases}):
+    def compute(self):
+        return 1
+
+    @property
+    def value(self):
+        return 1
+
+    @classmethod
+    def from_row(cls, row):
+        return cls()
+"""
+
+
+def declare_with_super(number: int, plain: bool = False) -> float:
+    """Return the duration of the declaration of a class using the zero argument
+    ``super()`` and holding a large data table, in nanoseconds."""
+    bases = "" if plain else "metaclass=ExtendableMeta"
+    namespace: Dict[str, Any] = {
+        "__name__": "_super_bench",
+        "ExtendableMeta": ExtendableMeta,
+        "TABLE": {idx: str(idx) for idx in range(200000)},
+    }
+    exec(SUPER_ROOT_SOURCE.format(bases=bases), namespace)
+    code = compile(SUPER_CLASS_SOURCE, "_super_bench", "exec")
+    return measure(lambda: exec(code, namespace), number)
+
+
+def init_registry(
+    workload: Workload, repeat: int
+) -> "tuple[float, int, registry.ExtendableClassesRegistry]":
+    """Return the best duration of init_registry, in seconds, the memory retained
+    by the registry, in bytes, and the last registry built."""
+    durations = []
+    for _idx in range(repeat):
+        gc.collect()
+        _registry = registry.ExtendableClassesRegistry()
+        start = time.perf_counter()
+        _registry.init_registry(workload.module_matchings)
+        durations.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    _registry = registry.ExtendableClassesRegistry()
+    _registry.init_registry(workload.module_matchings)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return min(durations), memory, _registry
+
+
+def run_size(size: int, args: argparse.Namespace) -> List[Result]:
+    results: List[Result] = []
+
+    def record(
+        name: str, value: float, unit: str, baseline: Optional[float] = None
+    ) -> None:
+        result: Result = {"benchmark": name, "size": size, "value": value, "unit": unit}
+        if baseline is not None:
+            result["baseline"] = baseline
+            result["overhead"] = value / baseline if baseline else None
+        results.append(result)
+        overhead = f"  x{value / baseline:.2f}" if baseline else ""
+        print(f"{size:>7} {name:<28} {value:14.1f} {unit:<5}{overhead}")
+
+    options = dict(modules=args.modules, depth=args.depth, cross_refs=args.cross_refs)
+    workload = Workload(f"_xbench{size}", size, **options)
+    plain = Workload(f"_pbench{size}", size, plain=True, **options)
+    with isolated_declarations():
+        duration = declare(workload)
+        plain_duration = declare(plain)
+        record(
+            "declaration",
+            duration / workload.class_count * 1e9,
+            "ns",
+            plain_duration / plain.class_count * 1e9,
+        )
+        number = min(args.number, 10000)
+        record(
+            "declaration_super",
+            declare_with_super(number),
+            "ns",
+            declare_with_super(number, plain=True),
+        )
+        repeat = 1 if size >= 10000 else 3
+        duration, memory, _registry = init_registry(workload, repeat)
+        record("init_registry", duration * 1e3, "ms")
+        record("init_registry_memory", memory / 1024, "KiB")
+
+        token = context.extendable_registry.set(_registry)
+        try:
+            number = args.number
+            # the last class has the deepest hierarchy
+            idx = size - 1
+            blueprint = workload.get_class(idx)
+            assembled = _registry[blueprint.__xreg_name__]
+            plain_cls = plain.get_class(idx)
+            root = workload.get_class(0)
+            plain_root = plain.get_class(0)
+            other = workload.get_class(1) if size > 1 else root
+            plain_other = plain.get_class(1) if size > 1 else plain_root
+            instance = blueprint(1)
+            plain_instance = plain_cls(1)
+            record(
+                "instantiation",
+                measure(lambda: blueprint(1), number),
+                "ns",
+                measure(lambda: plain_cls(1), number),
+            )
+            record(
+                "instantiation_assembled",
+                measure(lambda: assembled(1), number),
+                "ns",
+                measure(lambda: plain_cls(1), number),
+            )
+            record(
+                "classmethod",
+                measure(lambda: blueprint.from_row(1), number),
+                "ns",
+                measure(lambda: plain_cls.from_row(1), number),
+            )
+            record(
+                "isinstance",
+                measure(lambda: isinstance(instance, blueprint), number),
+                "ns",
+                measure(lambda: isinstance(plain_instance, plain_cls), number),
+            )
+            record(
+                "isinstance_negative",
+                measure(lambda: isinstance(instance, other), number),
+                "ns",
+                measure(lambda: isinstance(plain_instance, plain_other), number),
+            )
+            record(
+                "issubclass",
+                measure(lambda: issubclass(blueprint, root), number),
+                "ns",
+                measure(lambda: issubclass(plain_cls, plain_root), number),
+            )
+            # the ancestors of the last class declared, the one with the
+            # highest id
+            record("ancestors_size", sys.getsizeof(assembled.__xreg_ancestors__), "B")
+        finally:
+            context.extendable_registry.reset(token)
+    workload.unload()
+    plain.unload()
+    return results
+
+
+def compare(results: List[Result], previous_file: str, threshold: float) -> bool:
+    """Print the relative change of each measure and return False if a measure
+    regressed by more than ``threshold``."""
+    with open(previous_file) as f:
+        previous = {
+            (r["benchmark"], r["size"]): r["value"] for r in json.load(f)["results"]
+        }
+    ok = True
+    for result in results:
+        before = previous.get((result["benchmark"], result["size"]))
+        if not before:
+            continue
+        change = result["value"] / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{result['size']:>7} {result['benchmark']:<28} {change:+8.1%}{flag}")
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10,1000,10000")
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--cross-refs", type=float, default=0.2)
+    parser.add_argument("--number", type=int, default=100000)
+    parser.add_argument("--output", help="file where the results are written")
+    parser.add_argument("--compare", help="previous results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    results: List[Result] = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        results.extend(run_size(size, args))
+    document = {
+        "extendable": __version__,
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "parameters": {
+            "modules": args.modules,
+            "depth": args.depth,
+            "cross_refs": args.cross_refs,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    if args.compare and not compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
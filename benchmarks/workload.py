@@ -0,0 +1,223 @@
+"""Synthetic workload generator for the benchmarks.
+
+A workload is made of ``classes`` extendable classes spread over ``modules``
+modules. Each class is extended ``depth`` times by extension modules and some
+classes inherit from a class declared before them (cross references).
+
+The same workload can be generated as plain python classes where each extension
+is a subclass of the previous level. This is the baseline used to compute the
+overhead of the extendable classes.
+"""
+
+import collections
+import random
+import sys
+import types
+from contextlib import contextmanager
+from types import CodeType
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from extendable import main, utils
+
+ROOT_TEMPLATE = """
+class {name}({bases}):
+    def __init__(self, value):
+        self.value = value
+
+    def compute(self):
+        return self.value
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row)
+"""
+
+CHILD_TEMPLATE = """
+class {name}({bases}):
+    def compute(self):
+        return super().compute() + 1
+"""
+
+EXTENSION_TEMPLATE = """
+class {name}({bases}):
+    def compute(self):
+        return super().compute() + 1
+
+    @classmethod
+    def from_row(cls, row):
+        return super().from_row(row)
+"""
+
+
+class Workload:
+    """The python sources of the modules of a synthetic workload.
+
+    In ``plain`` mode, the classes are declared in dependency order: the
+    levels of a class are subclasses of the previous level and a class
+    referencing another one inherits from the last level of this class.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        classes: int,
+        modules: int = 10,
+        depth: int = 3,
+        cross_refs: float = 0.2,
+        plain: bool = False,
+        seed: int = 42,
+    ) -> None:
+        self.prefix = prefix
+        self.classes = classes
+        self.modules = max(1, min(modules, classes))
+        self.depth = depth
+        self.plain = plain
+        rnd = random.Random(seed)
+        # the class referenced as base by some classes. The parent is always
+        # declared into a module loaded before the module of the class or
+        # before the class into the same module
+        self.parents: Dict[int, int] = {}
+        for idx in range(1, classes):
+            if rnd.random() < cross_refs:
+                parent = rnd.randrange(idx)
+                module = min(parent % self.modules, idx % self.modules)
+                self.parents[idx] = parent - parent % self.modules + module
+        if plain:
+            self.sources = self._generate_plain()
+        else:
+            self.sources = self._generate()
+
+    @property
+    def class_count(self) -> int:
+        """Number of class declarations into the workload."""
+        return self.classes * (self.depth + 1)
+
+    def class_name(self, idx: int, level: int = 0) -> str:
+        return f"C{idx}" if not level else f"C{idx}Ext{level}"
+
+    def module_name(self, idx: int, level: int = 0) -> str:
+        if self.plain:
+            # contiguous chunks of classes, as many modules as for the
+            # extendable classes
+            chunk = -(-self.classes // (self.modules * (self.depth + 1)))
+            return f"{self.prefix}.plain{idx // chunk}"
+        module = idx % self.modules
+        if not level:
+            return f"{self.prefix}.core{module}"
+        return f"{self.prefix}.ext{level}_{module}"
+
+    def _generate(self) -> List[Tuple[str, str]]:
+        sources: Dict[str, List[str]] = collections.OrderedDict()
+        for level in range(self.depth + 1):
+            for idx in range(self.classes):
+                module = self.module_name(idx, level)
+                lines = sources.setdefault(
+                    module, ["from extendable import ExtendableMeta"]
+                )
+                if not level:
+                    parent = self.parents.get(idx)
+                    if parent is None:
+                        lines.append(
+                            ROOT_TEMPLATE.format(
+                                name=self.class_name(idx),
+                                bases="metaclass=ExtendableMeta",
+                            )
+                        )
+                        continue
+                    if self.module_name(parent) != module:
+                        lines.append(self._import(parent, 0))
+                    lines.append(
+                        CHILD_TEMPLATE.format(
+                            name=self.class_name(idx), bases=self.class_name(parent)
+                        )
+                    )
+                    continue
+                lines.append(self._import(idx, level - 1))
+                lines.append(
+                    EXTENSION_TEMPLATE.format(
+                        name=self.class_name(idx, level),
+                        bases=f"{self.class_name(idx, level - 1)}, extends=True",
+                    )
+                )
+        return [(module, "\n".join(lines)) for module, lines in sources.items()]
+
+    def _generate_plain(self) -> List[Tuple[str, str]]:
+        sources: Dict[str, List[str]] = collections.OrderedDict()
+        for idx in range(self.classes):
+            module = self.module_name(idx)
+            lines = sources.setdefault(module, [])
+            parent = self.parents.get(idx)
+            if parent is None:
+                lines.append(ROOT_TEMPLATE.format(name=self.class_name(idx), bases=""))
+            else:
+                if self.module_name(parent) != module:
+                    lines.append(self._import(parent, self.depth))
+                lines.append(
+                    CHILD_TEMPLATE.format(
+                        name=self.class_name(idx),
+                        bases=self.class_name(parent, self.depth),
+                    )
+                )
+            for level in range(1, self.depth + 1):
+                lines.append(
+                    EXTENSION_TEMPLATE.format(
+                        name=self.class_name(idx, level),
+                        bases=self.class_name(idx, level - 1),
+                    )
+                )
+        return [(module, "\n".join(lines)) for module, lines in sources.items()]
+
+    def _import(self, idx: int, level: int) -> str:
+        return (
+            f"from {self.module_name(idx, level)} "
+            f"import {self.class_name(idx, level)}"
+        )
+
+    @property
+    def module_matchings(self) -> List[str]:
+        return [f"{self.prefix}.*"]
+
+    def compile(self) -> List[Tuple[str, CodeType]]:
+        """Compile the modules of the workload."""
+        return [
+            (name, compile(source, f"<{name}>", "exec"))
+            for name, source in self.sources
+        ]
+
+    def load(self, codes: Optional[List[Tuple[str, CodeType]]] = None) -> None:
+        """Import the modules of the workload."""
+        package = types.ModuleType(self.prefix)
+        package.__path__ = []
+        sys.modules[self.prefix] = package
+        for name, code in codes or self.compile():
+            module = types.ModuleType(name)
+            sys.modules[name] = module
+            exec(code, module.__dict__)
+
+    def unload(self) -> None:
+        for name, _source in self.sources:
+            sys.modules.pop(name, None)
+        sys.modules.pop(self.prefix, None)
+
+    def get_class(self, idx: int) -> Any:
+        """Return the class the application uses for the class ``idx``.
+
+        The root extendable class or the last level of the plain class.
+        """
+        level = self.depth if self.plain else 0
+        module = sys.modules[self.module_name(idx, level)]
+        return getattr(module, self.class_name(idx, level))
+
+
+@contextmanager
+def isolated_declarations() -> Iterator[None]:
+    """Isolate the class definitions collected by the metaclass."""
+    class_defs = main._extendable_class_defs_by_module
+    modules_index = main._modules_index
+    main._extendable_class_defs_by_module = collections.OrderedDict()
+    main._modules_index = utils.ModuleIndex()
+    try:
+        yield
+    finally:
+        main._extendable_class_defs_by_module = class_defs
+        main._modules_index = modules_index
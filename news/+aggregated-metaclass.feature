@@ -0,0 +1,3 @@
+Aggregated classes are now built with a dedicated metaclass derived from the
+metaclass of the class definition. They are instantiated through the native
+`type.__call__` and are as fast to instantiate as plain python classes.
@@ -0,0 +1,4 @@
+`isinstance` and `issubclass` checks against extendable classes are now a single
+lookup into a precomputed set of the ids of the ancestors of the aggregated classes.
+The ancestors of an aggregated class now include the ancestors of all the levels of
+its hierarchy.
@@ -0,0 +1,3 @@
+Keep an inline cache of the assembled class on each original class. Instantiating
+an original class no longer looks up the registry by name when the registry used
+is the same as the previous time.
@@ -0,0 +1,4 @@
+New ``ExtendableMeta._build_aggregated_class`` hook called to build the
+aggregated classes with a ``final`` flag telling if the class is the final
+class of the hierarchy or an intermediate one, so that a costly metaclass can
+skip the work only useful to the final class.
@@ -0,0 +1,5 @@
+New ``create_many`` class method creating the instances of an extendable class
+from an iterable of positional arguments, and new
+``ExtendableClassesRegistry.bind()`` method returning the aggregated class of
+an extendable class. Both resolve the aggregated class once instead of at each
+instantiation.
@@ -0,0 +1,4 @@
+Faster dispatch of the classmethods wrapped on the original classes. The method to
+call is now resolved once per registry and cached by the registry. The validation of
+the arguments against the signature of the initial method is now only done if
+`extendable.main.strict_class_method_signature` is set to `True`.
@@ -0,0 +1,5 @@
+Reduce the memory used by the class definitions collected at declaration
+time: ``ExtendableClassDef`` uses ``__slots__`` and tuples, the declaration
+namespace is no more copied and the clones share the namespace and the bases
+of the declared class definitions. The new ``main.class_defs_footprint``
+function reports the memory used by the class definitions.
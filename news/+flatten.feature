@@ -0,0 +1,3 @@
+New ``flatten`` mode of ``ExtendableClassesRegistry`` merging the consecutive
+levels of a class hierarchy into a single aggregated class when the merge
+doesn't change the behaviour of the class.
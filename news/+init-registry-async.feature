@@ -0,0 +1,3 @@
+New ``ExtendableClassesRegistry.init_registry_async()`` coroutine initializing
+the registry step by step and giving the control back to the asyncio event
+loop every ``time_slice`` seconds.
@@ -0,0 +1,3 @@
+Add a `lazy` mode to the registry. In this mode, the classes are built with their
+bases the first time they are requested instead of when the registry is
+initialized.
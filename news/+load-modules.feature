@@ -0,0 +1,2 @@
+Add a `load_modules` method to the registry to load new modules into an initialized
+registry. Only the classes impacted by the new class definitions are rebuilt.
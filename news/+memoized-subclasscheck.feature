@@ -0,0 +1,2 @@
+The results of `issubclass` checks whose first argument is an original extendable
+class are memoized by the current registry until the registry is modified.
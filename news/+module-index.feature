@@ -0,0 +1,4 @@
+The index of the modules declaring extendable classes is now maintained in memory
+as the classes are declared instead of being rebuilt into a SQLite database at each
+registry initialization. Module expressions starting with `!` exclude the matching
+modules.
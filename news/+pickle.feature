@@ -0,0 +1,3 @@
+The instances of the aggregated classes can be pickled. Their class is pickled
+by its name into the registry and is retrieved from the registry of the
+unpickling context, once for all the instances pickled together.
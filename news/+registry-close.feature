@@ -0,0 +1,6 @@
+New ``ExtendableClassesRegistry.close()`` method (also called when the registry
+is used as a context manager) releasing the classes, the class definitions and
+the caches of a registry, and new ``footprint()`` method reporting the number
+of classes, of hierarchy levels and the approximate memory used by a registry.
+The original classes only keep weak references to the aggregated classes.
+``ExtendableRegistryPool`` can close the evicted registries.
@@ -0,0 +1,4 @@
+New ``ExtendableClassesRegistry.freeze()`` method building all the classes,
+populating the runtime caches and exposing the classes as a read-only mapping
+so that the registry is no more modified. Intended to share the registry
+memory between the processes forked by a pre-fork server.
@@ -0,0 +1,3 @@
+New ``ExtendableRegistryHolder`` publishing a rebuilt registry atomically
+with a generation number while the requests in progress end with the
+previous registry.
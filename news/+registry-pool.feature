@@ -0,0 +1,5 @@
+Add an `ExtendableRegistryPool` sharing the initialized registries between the
+callers requiring the same list of modules. The least recently used registries
+are evicted when the pool exceeds a number of registries or an approximate memory
+size. The new `on_registry_created` and `on_registry_evicted` listener hooks are
+called by the pool.
@@ -0,0 +1,4 @@
+New listener hooks reporting the timings of the registry initialization phases,
+of the modules loading and of each extendable class build. The new
+``extendable.stats.RegistryStatsListener`` aggregates them into exportable
+statistics.
@@ -0,0 +1,3 @@
+New ``share_classes`` option of ``ExtendableClassesRegistry`` sharing the
+aggregated classes built from the same class definitions on the same bases
+between registries.
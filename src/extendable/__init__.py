@@ -8,4 +8,4 @@ from .version import __version__
 # __all__ doesn't restrict access to others members, but they are at least
 # removed from the list of imported members when imported with
 # from extendable import *
-__all__ = ["registry", "context", "ExtendableMeta"]
+__all__ = ["registry", "context", "pool", "holder", "stats", "ExtendableMeta"]
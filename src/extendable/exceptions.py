@@ -1,2 +1,6 @@
 class RegistryNotInitializedError(Exception):
     pass
+
+
+class RegistryFrozenError(Exception):
+    pass
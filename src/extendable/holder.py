@@ -0,0 +1,105 @@
+"""A holder of the registry in use, replaced atomically when rebuilt."""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .context import extendable_registry
+from .exceptions import RegistryNotInitializedError
+from .registry import ExtendableClassesRegistry
+
+
+class ExtendableRegistryHolder:
+    """Hold the current registry and its generation.
+
+    A new registry can be built while the current one is used and
+    published atomically once initialized. Each published registry gets a
+    new generation number. The callers pick the current registry up at
+    the beginning of a request or a task with :meth:`use`::
+
+        holder = ExtendableRegistryHolder()
+        holder.rebuild(["module1", "module2.*"])
+
+        def handle_request():
+            with holder.use():
+                ...
+
+    The requests started before a publication keep using the previous
+    registry until they end. The holder doesn't keep any reference to the
+    previous registries, which are therefore released once no more used.
+    """
+
+    def __init__(
+        self,
+        registry_factory: Callable[
+            [], ExtendableClassesRegistry
+        ] = ExtendableClassesRegistry,
+    ) -> None:
+        self.registry_factory = registry_factory
+        self._current: Tuple[Optional[ExtendableClassesRegistry], int] = (None, 0)
+        self._lock = threading.Lock()
+
+    @property
+    def registry(self) -> Optional[ExtendableClassesRegistry]:
+        """The current registry, None if no registry has been published."""
+        return self._current[0]
+
+    @property
+    def generation(self) -> int:
+        """The generation of the current registry, 0 if no registry has been
+        published."""
+        return self._current[1]
+
+    def current(self) -> Tuple[ExtendableClassesRegistry, int]:
+        """Return the current registry with its generation.
+
+        Raise RegistryNotInitializedError if no registry has been published.
+        """
+        registry, generation = self._current
+        if registry is None:
+            raise RegistryNotInitializedError("No registry has been published")
+        return registry, generation
+
+    def publish(self, registry: ExtendableClassesRegistry) -> int:
+        """Make the given initialized registry the current one and return its
+        generation."""
+        if not registry.ready:
+            raise RegistryNotInitializedError(
+                "Only an initialized registry can be published"
+            )
+        with self._lock:
+            generation = self._current[1] + 1
+            self._current = (registry, generation)
+        return generation
+
+    def rebuild(self, module_matchings: Optional[List[str]] = None) -> int:
+        """Build a new registry for the given module matchings, publish it and
+        return its generation.
+
+        The current registry is used until the new one is published.
+        """
+        registry = self.registry_factory()
+        registry.init_registry(module_matchings)
+        return self.publish(registry)
+
+    async def rebuild_async(
+        self,
+        module_matchings: Optional[List[str]] = None,
+        time_slice: float = 0.01,
+    ) -> int:
+        """Asynchronous version of :meth:`rebuild` initializing the new registry
+        with :meth:`ExtendableClassesRegistry.init_registry_async`."""
+        registry = self.registry_factory()
+        await registry.init_registry_async(module_matchings, time_slice)
+        return self.publish(registry)
+
+    @contextmanager
+    def use(self) -> Iterator[ExtendableClassesRegistry]:
+        """Set the current registry as the ``extendable_registry`` of the
+        context until the end of the block."""
+        registry, _generation = self.current()
+        token = extendable_registry.set(registry)
+        try:
+            yield registry
+        finally:
+            extendable_registry.reset(token)
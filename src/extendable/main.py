@@ -1,8 +1,30 @@
 import collections
+import copyreg
 import functools
 import inspect
+import itertools
+import pickle
 import sys
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Type, no_type_check
+import threading
+import types
+import weakref
+from contextvars import ContextVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    cast,
+    no_type_check,
+)
 
 if sys.version_info >= (3, 7):
     from typing import OrderedDict
@@ -13,8 +35,26 @@ from abc import ABCMeta
 
 from .context import extendable_registry
 from .exceptions import RegistryNotInitializedError
+from .utils import ModuleIndex
+
+# True while a registry is built into the current context. In build mode, the
+# classes created by the metaclass are the aggregated ones.
+_registry_build_mode: ContextVar[bool] = ContextVar(
+    "extendable_registry_build_mode", default=False
+)
+
+# When True, the arguments given to a wrapped classmethod are validated against
+# the signature of the initial method before the call is dispatched. This
+# validation is costly and is therefore only intended for debugging purpose.
+strict_class_method_signature = False
+
+# The value of the inline cache of the assembled class on a class before any
+# lookup. Registry generations start at 1.
+_EMPTY_ASSEMBLED_CLS_CACHE = (0, None)
+
+# The kwargs shared by the class definitions declared without kwargs
+_EMPTY_KWARGS: Mapping[str, Any] = types.MappingProxyType({})
 
-_registry_build_mode = False
 if TYPE_CHECKING:
     from .registry import ExtendableClassesRegistry
 
@@ -22,40 +62,57 @@ if TYPE_CHECKING:
 
 
 class ExtendableClassDef:
+    __slots__ = (
+        "name",
+        "base_names",
+        "original_base_names",
+        "namespace",
+        "original_name",
+        "others_bases",
+        "hierarchy",
+        "metaclass",
+        "original_cls",
+        "kwargs",
+    )
+
     name: str
-    base_names: List[str]
-    original_base_names: List[str]
-    namespace: Dict[str, Any]
+    base_names: Tuple[str, ...]
+    original_base_names: Tuple[str, ...]
+    namespace: Mapping[str, Any]
     original_name: str
-    others_bases: List[Any]
-    hierarchy: List["ExtendableClassDef"]
+    others_bases: Tuple[Any, ...]
+    hierarchy: Tuple["ExtendableClassDef", ...]
     metaclass: "ExtendableMeta"
     original_cls: Type["ExtendableMeta"]
-    kwargs: Dict[str, Any]
+    kwargs: Mapping[str, Any]
 
     def __init__(
         self,
         original_name: str,
-        bases: List[Any],
-        namespace: Dict[str, Any],
+        bases: Tuple[Any, ...],
+        namespace: Mapping[str, Any],
         metaclass: "ExtendableMeta",
-        kwargs: Dict[str, Any],
+        kwargs: Mapping[str, Any],
     ) -> None:
         self.namespace = namespace
         self.name = namespace["__xreg_name__"]
         self.original_name = original_name
         self.others_bases = bases
-        self.base_names = namespace["__xreg_base_names__"].copy() or []
-        self.original_base_names = self.base_names.copy()
-        self.hierarchy = [self]
+        # the base names are immutable and therefore shared with the clones
+        self.base_names = self.original_base_names = tuple(
+            namespace["__xreg_base_names__"]
+        )
+        self.hierarchy = (self,)
         self.metaclass = metaclass
-        self.kwargs = kwargs
+        self.kwargs = kwargs or _EMPTY_KWARGS
 
     def add_child(self, cls_def: "ExtendableClassDef") -> None:
-        self.hierarchy.append(cls_def)
-        for name in cls_def.base_names:
-            if name not in self.base_names:
-                self.base_names.append(name)
+        self.hierarchy += (cls_def,)
+        new_names = tuple(
+            name for name in cls_def.base_names if name not in self.base_names
+        )
+        if new_names:
+            self.base_names += new_names
 
     @property
     def is_mixed_bases(self) -> bool:
@@ -67,6 +124,44 @@ class ExtendableClassDef:
             f"{self.namespace['__module__']}.{self.namespace['__qualname__']}"
         )
 
+    def build_namespace(self, **overlay: Any) -> Dict[str, Any]:
+        """Return the namespace to use to build an aggregated class from this
+        class definition.
+
+        The namespace of the class definition is shared by all the
+        registries and is never modified. The given ``overlay`` is applied
+        on a copy of the namespace. If the namespace contains a
+        ``__classcell__``, a new cell is provided to bind the zero argument
+        ``super()`` to the new class, together with copies of the methods
+        referencing the cell. If the cell is referenced by values that can't
+        be copied, the declared cell is kept and is bound to the last class
+        built from the namespace.
+        """
+        namespace = dict(self.namespace)
+        if "__classcell__" in namespace:
+            keys = self.class_cell_keys
+            if keys is not None:
+                namespace.update(_class_cell_overlay(self.namespace, keys))
+        namespace.update(overlay)
+        return namespace
+
+    @property
+    def class_cell_keys(self) -> Optional[Tuple[str, ...]]:
+        """The keys of the namespace values referencing the ``__classcell__``,
+        None if the ``__classcell__`` can't be replaced.
+
+        The keys are computed on the first build of the class and shared by
+        the clones of the class definition.
+        """
+        try:
+            return _class_cell_keys_cache[self.original_cls]
+        except KeyError:
+            pass
+        keys = _class_cell_keys(self.namespace)
+        with _class_cell_keys_lock:
+            _class_cell_keys_cache[self.original_cls] = keys
+        return keys
+
     def clone(self) -> "ExtendableClassDef":
         """Clone the class definition, but not the class itself nor the information
         about the hierarchy.
@@ -74,35 +169,322 @@ class ExtendableClassDef:
         This is used to allow to recompute the registry from scratch by
         starting from the original class definition. This definition is
         then modified by the build process to define the class
-        hierarchy.
+        hierarchy. The namespace, the bases and the kwargs are shared
+        with the clone.
         """
-        clone = ExtendableClassDef(
-            self.original_name,
-            self.others_bases,
-            self.namespace,
-            self.metaclass,
-            self.kwargs,
-        )
+        clone = ExtendableClassDef.__new__(ExtendableClassDef)
+        clone.namespace = self.namespace
+        clone.name = self.name
+        clone.original_name = self.original_name
+        clone.others_bases = self.others_bases
+        clone.base_names = clone.original_base_names = self.original_base_names
+        clone.hierarchy = (clone,)
+        clone.metaclass = self.metaclass
+        clone.kwargs = self.kwargs
         clone.original_cls = self.original_cls
         return clone
 
 
+# the class_cell_keys of the class definitions by original class
+_class_cell_keys_cache: MutableMapping[type, Optional[Tuple[str, ...]]] = (
+    weakref.WeakKeyDictionary()
+)
+_class_cell_keys_lock = threading.Lock()
+
+
+def _new_cell() -> Any:
+    """Return a new empty cell."""
+    if False:  # pragma: no cover
+        value: Any = None
+    return cast(Tuple[Any, ...], (lambda: value).__closure__)[0]
+
+
+_CellType = type(_new_cell())
+
+
+def _rebind_cell(value: Any, old_cell: Any, new_cell: Any) -> Any:
+    """Return a copy of the given function, method or property where
+    the ``old_cell`` is replaced by the ``new_cell`` into the closure.
+
+    The value is returned as is if it doesn't reference the old cell.
+    """
+    if isinstance(value, types.FunctionType):
+        closure = value.__closure__
+        if not closure or not any(cell is old_cell for cell in closure):
+            return value
+        func = types.FunctionType(
+            value.__code__,
+            value.__globals__,
+            value.__name__,
+            value.__defaults__,
+            tuple(new_cell if cell is old_cell else cell for cell in closure),
+        )
+        func.__kwdefaults__ = value.__kwdefaults__
+        func.__qualname__ = value.__qualname__
+        func.__module__ = value.__module__
+        func.__doc__ = value.__doc__
+        func.__dict__.update(value.__dict__)
+        if hasattr(value, "__annotate__"):
+            # python >= 3.14, the annotations are evaluated lazily
+            func.__annotate__ = value.__annotate__  # type: ignore[attr-defined]
+        else:
+            func.__annotations__ = value.__annotations__
+        return func
+    if isinstance(value, (classmethod, staticmethod)):
+        func = _rebind_cell(value.__func__, old_cell, new_cell)
+        if func is value.__func__:
+            return value
+        return type(value)(func)
+    if isinstance(value, property):
+        fget, fset, fdel = (
+            _rebind_cell(accessor, old_cell, new_cell)
+            for accessor in (value.fget, value.fset, value.fdel)
+        )
+        if fget is value.fget and fset is value.fset and fdel is value.fdel:
+            return value
+        return type(value)(fget, fset, fdel, value.__doc__)
+    return value
+
+
+# the types of the values that can't reach a closure cell, not explored
+_NO_CLOSURE_TYPES = (
+    type,
+    types.ModuleType,
+    types.CodeType,
+    str,
+    bytes,
+    bytearray,
+    int,
+    float,
+    complex,
+    range,
+    type(None),
+    tuple,
+    list,
+    dict,
+    set,
+    frozenset,
+)
+
+
+def _closure_referents(value: Any) -> List[Any]:
+    """Return the objects referenced by the given value through which a
+    closure cell can be reached.
+
+    Only the callables and the descriptors wrapping them are explored. Data
+    containers are never explored.
+    """
+    if isinstance(value, types.FunctionType):
+        referents = list(value.__closure__ or ())
+        wrapped = value.__dict__.get("__wrapped__")
+        if wrapped is not None:
+            referents.append(wrapped)
+        return referents
+    if isinstance(value, _CellType):
+        try:
+            return [value.cell_contents]
+        except ValueError:
+            # empty cell
+            return []
+    if isinstance(value, (classmethod, staticmethod)):
+        return [value.__func__]
+    if isinstance(value, property):
+        return [value.fget, value.fset, value.fdel]
+    if isinstance(value, _NO_CLOSURE_TYPES):
+        return []
+    # functools.partial, partialmethod, cached_property, decorators exposing
+    # the wrapped callable, ...
+    return [
+        getattr(value, name, None)
+        for name in ("__wrapped__", "__func__", "func", "wrapped")
+    ]
+
+
+def _reaches_cell(value: Any, cell: Any) -> bool:
+    """Return True if the given cell can be reached from the given value
+    through closures, wrapped functions or descriptors."""
+    stack = [value]
+    seen: Set[int] = set()
+    while stack:
+        value = stack.pop()
+        if value is cell:
+            return True
+        if value is None or id(value) in seen:
+            continue
+        seen.add(id(value))
+        stack.extend(_closure_referents(value))
+    return False
+
+
+def _is_rebindable(value: Any, cell: Any) -> bool:
+    """Return True if :func:`_rebind_cell` replaces all the references of
+    the given value to the given cell."""
+    functions: List[Any]
+    if isinstance(value, (classmethod, staticmethod)):
+        functions = [value.__func__]
+    elif isinstance(value, property):
+        functions = [value.fget, value.fset, value.fdel]
+    else:
+        functions = [value]
+    for function in functions:
+        if function is None:
+            continue
+        if not isinstance(function, types.FunctionType):
+            return False
+        # the cell must only be referenced directly by the closure
+        referents = _closure_referents(function)
+        if any(_reaches_cell(r, cell) for r in referents if r is not cell):
+            return False
+    return True
+
+
+def _class_cell_keys(namespace: Mapping[str, Any]) -> Optional[Tuple[str, ...]]:
+    """Return the keys of the values of the namespace referencing the
+    ``__classcell__`` of the namespace.
+
+    Return None if the ``__classcell__`` is referenced by a value that
+    can't be copied with a new cell (e.g. a decorated method, a
+    ``functools.cached_property`` or a ``functools.partialmethod``). The
+    declared ``__classcell__`` must then be used to build the classes.
+    """
+    cell = namespace.get("__classcell__")
+    if cell is None:
+        return ()
+    keys = []
+    for key, value in namespace.items():
+        if key == "__classcell__" or not _reaches_cell(value, cell):
+            continue
+        if not _is_rebindable(value, cell):
+            return None
+        keys.append(key)
+    return tuple(keys)
+
+
+def _class_cell_overlay(
+    namespace: Mapping[str, Any], keys: Iterable[str]
+) -> Dict[str, Any]:
+    """Return a new ``__classcell__`` and the copies of the values of the given
+    keys referencing the ``__classcell__`` of the given namespace.
+
+    The ``__classcell__`` is bound by python to the class built from the
+    namespace. Each class built from the same namespace must therefore get
+    its own cell so that the zero argument ``super()`` of its methods
+    refers to this class.
+    """
+    old_cell = namespace["__classcell__"]
+    new_cell = _new_cell()
+    overlay = {"__classcell__": new_cell}
+    for key in keys:
+        overlay[key] = _rebind_cell(namespace[key], old_cell, new_cell)
+    return overlay
+
+
+def class_defs_footprint(
+    class_defs: Optional[Iterable[ExtendableClassDef]] = None,
+) -> Dict[str, int]:
+    """Return an approximation of the memory used by class definitions.
+
+    If no class definitions are given, the ones collected by the metaclass
+    for all the declared extendable classes are reported. The class
+    definitions into the hierarchy of the given ones are included. Objects
+    shared between class definitions (namespaces, base names, ...) are
+    counted once. The returned dict contains the number of ``class_defs``,
+    the number of distinct ``namespaces`` and the size in ``bytes``.
+    """
+    if class_defs is None:
+        with _class_defs_lock:
+            class_defs = [
+                cls_def
+                for cls_defs in _extendable_class_defs_by_module.values()
+                for cls_def in cls_defs
+            ]
+    seen: Set[int] = set()
+    count = namespaces = size = 0
+
+    def _sizeof(obj: Any) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    for class_def in class_defs:
+        for cls_def in class_def.hierarchy:
+            cls_def_size = _sizeof(cls_def)
+            if not cls_def_size:
+                continue
+            count += 1
+            namespace_size = _sizeof(cls_def.namespace)
+            if namespace_size:
+                # the namespace is a read-only proxy of the collected one
+                namespace_size += sys.getsizeof(dict(cls_def.namespace))
+            namespaces += bool(namespace_size)
+            size += (
+                cls_def_size
+                + namespace_size
+                + _sizeof(cls_def.base_names)
+                + _sizeof(cls_def.original_base_names)
+                + _sizeof(cls_def.others_bases)
+                + _sizeof(cls_def.hierarchy)
+                + _sizeof(cls_def.kwargs)
+            )
+    return {"class_defs": count, "namespaces": namespaces, "bytes": size}
+
+
 _extendable_class_defs_by_module: OrderedDict[str, List[ExtendableClassDef]] = (
     collections.OrderedDict()
 )
 
+# index of the modules declaring extendable classes, in declaration order
+_modules_index = ModuleIndex()
+
+# lock protecting the class definitions and the modules index against
+# concurrent declarations
+_class_defs_lock = threading.Lock()
+
+
+# small integer ids given to the registry names. The ancestors of the
+# aggregated classes are stored as sets of these ids.
+_xreg_ids: Dict[str, int] = {}
+# the registry names by id
+_xreg_names: List[str] = []
+
+
+def _intern_xreg_name(name: str) -> int:
+    """Return the id of the given registry name."""
+    xreg_id = _xreg_ids.get(name)
+    if xreg_id is None:
+        with _class_defs_lock:
+            xreg_id = _xreg_ids.get(name)
+            if xreg_id is None:
+                xreg_id = _xreg_ids[name] = len(_xreg_names)
+                _xreg_names.append(name)
+    return xreg_id
+
 
 def __register_class_def__(module: str, cls_def: ExtendableClassDef) -> None:
     global _extendable_class_defs_by_module
-    if module not in _extendable_class_defs_by_module:
-        _extendable_class_defs_by_module[module] = []
-    _extendable_class_defs_by_module[module].append(cls_def)
+    with _class_defs_lock:
+        if module not in _extendable_class_defs_by_module:
+            _extendable_class_defs_by_module[module] = []
+            _modules_index.add(module)
+        _extendable_class_defs_by_module[module].append(cls_def)
+
+
+def _resolve_modules(module_matchings: List[str]) -> List[str]:
+    """Return the modules declaring extendable classes matching the given
+    expressions."""
+    with _class_defs_lock:
+        return _modules_index.resolve(module_matchings)
 
 
 class ExtendableMeta(ABCMeta):
     __xreg_base_names__: List[str]
     __xreg_name__: str
-    __xreg_all_base_names__: Set[str]
+    __xreg_id__: int
+    # only defined on the aggregated classes, the default value avoids the cost
+    # of a failed attribute lookup on the other classes
+    __xreg_ancestors__: Optional[FrozenSet[int]] = None
+    __xreg_cache__: Tuple[int, Optional["weakref.ref[ExtendableMeta]"]]
     _is_aggregated_class: bool
     _original_cls: "ExtendableMeta"
 
@@ -110,10 +492,10 @@ class ExtendableMeta(ABCMeta):
     def __new__(metacls, name, bases, namespace, extends=None, **kwargs):
         """Create the expected class and collect the class definition that will be used
         at the end of registry load process to build the final class."""
-        class_def = None
         if isinstance(extends, bool) and extends:
             extends = bases[0]
-        if not _registry_build_mode:
+        build_mode = _registry_build_mode.get()
+        if not build_mode:
             namespace = metacls._prepare_namespace(
                 name=name, bases=bases, namespace=namespace, extends=extends, **kwargs
             )
@@ -123,12 +505,21 @@ class ExtendableMeta(ABCMeta):
             # for the original class, we wrap the class methods to forward
             # the call to the aggregated one at runtime
             namespace = metacls._wrap_class_methods(namespace)
-        # We build the Origial class
-        new_cls = metacls._build_original_class(
-            name=name, bases=bases, namespace=namespace, **kwargs
-        )
-        if not _registry_build_mode and class_def:
+            # We build the Origial class
+            new_cls = metacls._build_original_class(
+                name=name, bases=bases, namespace=namespace, **kwargs
+            )
             class_def.original_cls = new_cls
+        else:
+            # the registry tells if the class is the final class of the
+            # hierarchy or an intermediate one
+            final = namespace.pop("__xreg_final__", True)
+            new_cls = metacls._build_aggregated_class(
+                name=name, bases=bases, namespace=namespace, final=final, **kwargs
+            )
+        # each class must have its own cache since a cache inherited from a
+        # parent class would return the assembled class of the parent
+        new_cls.__xreg_cache__ = _EMPTY_ASSEMBLED_CLS_CACHE
         return new_cls
 
     @no_type_check
@@ -152,6 +543,7 @@ class ExtendableMeta(ABCMeta):
         namespace.update(
             {
                 "__xreg_name__": registry_name,
+                "__xreg_id__": _intern_xreg_name(registry_name),
                 "__xreg_base_names__": registry_base_names,
                 "_is_aggregated_class": False,
             }
@@ -168,7 +560,9 @@ class ExtendableMeta(ABCMeta):
         cls_def = ExtendableClassDef(
             original_name=name,
             bases=tuple(other_bases),
-            namespace=namespace.copy(),
+            # the namespace is frozen once collected since it is shared by all
+            # the registries
+            namespace=types.MappingProxyType(namespace),
             metaclass=metacls,
             kwargs=kwargs,
         )
@@ -190,6 +584,24 @@ class ExtendableMeta(ABCMeta):
         """
         return super().__new__(metacls, name, bases, namespace, **kwargs)
 
+    @no_type_check
+    @classmethod
+    def _build_aggregated_class(metacls, name, bases, namespace, final, **kwargs):
+        """Build an aggregated class into a registry.
+
+        A registry builds an aggregated class for each level of the hierarchy
+        of an extendable class. Only the last one, for which ``final`` is True,
+        is the class used at runtime. The other ones are only the bases of the
+        next level. A metaclass mixing ExtendableMeta with a costly metaclass
+        can override this method to skip the work only useful to the final
+        class for the intermediate classes.
+
+        By default, the class is built as an original class.
+        """
+        return metacls._build_original_class(
+            name=name, bases=bases, namespace=namespace, **kwargs
+        )
+
     @classmethod
     def _wrap_class_methods(metacls, namespace: Dict[str, Any]) -> Dict[str, Any]:
         """Wrap classmethods defined into the namespace to delegate the call to the
@@ -202,6 +614,36 @@ class ExtendableMeta(ABCMeta):
                 new_namespace[key] = value
         return new_namespace
 
+    @classmethod
+    def _get_aggregated_metaclass(metacls) -> Type["ExtendableMeta"]:
+        """Return the metaclass to use to build the aggregated classes.
+
+        The aggregated metaclass is a subclass of the current metaclass
+        that doesn't go through the :meth:`__call__` method defined by
+        the ExtendableMeta at instantiation. Aggregated classes are
+        therefore instantiated as plain python classes. A specific
+        ``__call__`` defined by a subclass of ExtendableMeta or by a
+        metaclass mixed with ExtendableMeta is preserved.
+        """
+        if issubclass(metacls, AggregatedExtendableMeta):
+            return metacls
+        aggregated_metaclass = _aggregated_metaclasses.get(metacls)
+        if aggregated_metaclass is None:
+            base: Type[ExtendableMeta] = AggregatedExtendableMeta
+            if super(ExtendableMeta, metacls).__call__ is not type.__call__:
+                # the __call__ of a metaclass following ExtendableMeta into
+                # the mro must not be bypassed
+                base = _DelegatingAggregatedExtendableMeta
+            aggregated_metaclass = type(
+                f"Aggregated{metacls.__name__}",
+                (metacls, base),
+                {"__module__": metacls.__module__},
+            )
+            # the aggregated classes are pickled by name
+            copyreg.pickle(aggregated_metaclass, _reduce_aggregated_class)
+            _aggregated_metaclasses[metacls] = aggregated_metaclass
+        return aggregated_metaclass
+
     @classmethod
     def _is_extendable(metacls, cls: Type[Any]) -> bool:
         return issubclass(type(cls), ExtendableMeta)
@@ -213,27 +655,39 @@ class ExtendableMeta(ABCMeta):
         """Wrap a class method to delegate the call to the final class.
 
         In addition to preserve the signature and the docstring, this
-        method will also preserve the validation of args and kwargs
-        against the signature of the initial method at method call.
+        method will also validate the args and kwargs against the
+        signature of the initial method at method call if
+        :data:`strict_class_method_signature` is set. The signature is
+        computed only once per method.
+
+        The method to call is resolved once per registry and cached by the
+        registry. If no registry is available or if the class is not part of
+        the registry, the initial method is called.
         """
         func = method.__func__
+        signature: Optional[inspect.Signature] = None
 
         @no_type_check
-        def new_method(cls, *args, _method_name=None, _initial_func=None, **kwargs):
-            # ensure that args and kwargs are conform to the
-            # initial signature
-            inspect.signature(_initial_func).bind(cls, *args, **kwargs)
-            try:
-                return getattr(cls._get_assembled_cls(), _method_name)(*args, **kwargs)
-            except (RegistryNotInitializedError, KeyError):
-                return _initial_func(cls, *args, **kwargs)
-
-        new_method_def = functools.partial(
-            new_method, _method_name=method_name, _initial_func=func
-        )
-        # preserve signature for IDE
-        functools.update_wrapper(new_method_def, func)
-        return classmethod(new_method_def)
+        @functools.wraps(func)
+        def new_method(cls, *args, **kwargs):
+            if strict_class_method_signature:
+                nonlocal signature
+                if signature is None:
+                    signature = inspect.signature(func)
+                # ensure that args and kwargs are conform to the
+                # initial signature
+                signature.bind(cls, *args, **kwargs)
+            registry = extendable_registry.get()
+            if registry is None:
+                return func(cls, *args, **kwargs)
+            target = registry._class_methods.get((cls, method_name))
+            if target is None:
+                target = registry._resolve_class_method(cls, method_name, func)
+            return target(*args, **kwargs)
+
+        # mark the wrapper to retrieve the initial method
+        new_method.__xreg_func__ = func
+        return classmethod(new_method)
 
     @no_type_check
     def __call__(cls, *args, **kwargs) -> "ExtendableMeta":
@@ -246,30 +700,79 @@ class ExtendableMeta(ABCMeta):
         """
         if cls._is_aggregated_class:
             return super().__call__(*args, **kwargs)
-        return cls._get_assembled_cls()(*args, **kwargs)
+        registry = extendable_registry.get()
+        generation, assembled_cls_ref = cls.__xreg_cache__
+        if registry is not None and generation == registry._generation:
+            # the registry holds the assembled class while its generation
+            # is unchanged
+            return assembled_cls_ref()(*args, **kwargs)
+        return cls._get_assembled_cls(registry)(*args, **kwargs)
+
+    def create_many(cls, iterable_of_args: Iterable[Iterable[Any]]) -> List[Any]:
+        """Create an instance for each tuple of positional arguments of the given
+        iterable.
+
+        The assembled class is resolved once for all the instances.
+        """
+        assembled_cls = cls if cls._is_aggregated_class else cls._get_assembled_cls()
+        return list(itertools.starmap(assembled_cls, iterable_of_args))
 
     ###############################################################
     # concrete methods provided to the final class by the metaclass
     ###############################################################
+    @property
+    def __xreg_all_base_names__(cls) -> Set[str]:  # noqa: B902
+        """The names of all the extendable classes an aggregated class
+        inherits from.
+
+        Computed from ``__xreg_ancestors__`` on access, the ids being the
+        only information kept on the aggregated classes.
+        """
+        ancestors = cls.__xreg_ancestors__
+        if ancestors is None:
+            raise AttributeError("__xreg_all_base_names__")
+        return {_xreg_names[xreg_id] for xreg_id in ancestors}
+
     def __instancecheck__(self, instance: Any) -> bool:  # noqa: B902
-        """Implement issubclass(sub, cls)."""
-        if not hasattr(instance, "__xreg_name__"):
-            return False
+        """Implement isinstance(instance, cls).
 
-        if instance.__xreg_name__ == self.__xreg_name__:
-            # this is the same class
-            return True
-        # self is a class and instance is an instance of a class
-        if self.__xreg_name__ in instance.__xreg_all_base_names__:
-            return True
-        return super().__instancecheck__(instance)
+        An aggregated class holds the set of the ids of all the extendable
+        classes it inherits from (itself included). The check is a single
+        set lookup.
+        """
+        ancestors = getattr(type(instance), "__xreg_ancestors__", None)
+        if ancestors is None:
+            # not an instance of an aggregated class
+            return type.__instancecheck__(self, instance)
+        return self.__xreg_id__ in ancestors
 
     def __subclasscheck__(cls, subclass: Any) -> bool:  # noqa: B902
-        """Implement issubclass(sub, cls)."""
-        if hasattr(subclass, "__xreg_all_base_names__"):
-            return cls.__xreg_name__ in subclass.__xreg_all_base_names__
+        """Implement issubclass(sub, cls).
+
+        When ``sub`` is an original extendable class, the result depends
+        on the registry. It's memoized by the current registry until the
+        registry is modified. The other classes are left to the caches of
+        ``ABCMeta``, which are invalidated by ``register``.
+        """
+        ancestors = getattr(subclass, "__xreg_ancestors__", None)
+        if ancestors is not None:
+            return cls.__xreg_id__ in ancestors
+        registry = extendable_registry.get()
+        if registry is None or not hasattr(subclass, "__xreg_name__"):
+            return cls._subclasscheck(subclass, registry)
+        key = (cls, subclass)
+        result = registry._subclass_checks.get(key)
+        if result is None:
+            result = cls._subclasscheck(subclass, registry)
+            if not registry.frozen:
+                registry._subclass_checks[key] = result
+        return result
+
+    def _subclasscheck(
+        cls, subclass: Any, registry: Optional["ExtendableClassesRegistry"]
+    ) -> bool:
         if hasattr(subclass, "__xreg_name__"):
-            _subclass = subclass._get_assembled_cls()
+            _subclass = subclass._get_assembled_cls(registry)
             return issubclass(_subclass, cls)
         return isinstance(subclass, type) and super().__subclasscheck__(subclass)
 
@@ -277,10 +780,83 @@ class ExtendableMeta(ABCMeta):
         cls, registry: Optional["ExtendableClassesRegistry"] = None
     ) -> "ExtendableMeta":
         """An helper method to get the final class (the aggregated one) for the current
-        class."""
+        class.
+
+        A weak reference to the result is kept into an inline cache on the class
+        together with the generation of the registry. Since the generations are
+        unique among all the registries and change each time a registry is
+        modified, the cache is always valid when the generation of the given
+        registry matches.
+        """
         registry = registry if registry else extendable_registry.get()
         if not registry:
             raise RegistryNotInitializedError(
                 "Extendable classes registry is not initialized"
             )
-        return registry[cls.__xreg_name__]
+        generation, assembled_cls_ref = cls.__xreg_cache__
+        if generation == registry._generation and assembled_cls_ref is not None:
+            return cast(ExtendableMeta, assembled_cls_ref())
+        generation = registry._generation
+        assembled_cls = registry[cls.__xreg_name__]
+        if not registry.frozen:
+            # the original class only holds a weak reference to the assembled
+            # class to not keep alive the classes of a dropped registry
+            cls.__xreg_cache__ = (generation, weakref.ref(assembled_cls))
+        return assembled_cls
+
+
+class AggregatedExtendableMeta(ExtendableMeta):
+    """Metaclass of the aggregated classes built by the registry.
+
+    Aggregated classes are the final classes, there is no need to look
+    for the assembled class at instantiation. The native ``type.__call__``
+    is used in place of :meth:`ExtendableMeta.__call__`.
+    """
+
+    __call__ = type.__call__
+
+
+class _DelegatingAggregatedExtendableMeta(AggregatedExtendableMeta):
+    """Metaclass of the aggregated classes built by the registry when the
+    metaclass of the original classes is mixed with a metaclass defining a
+    ``__call__``.
+
+    :meth:`ExtendableMeta.__call__` is bypassed but the ``__call__`` of the
+    metaclasses following ExtendableMeta into the mro is called.
+    """
+
+    @no_type_check
+    def __call__(cls, *args, **kwargs):
+        return super(ExtendableMeta, cls).__call__(*args, **kwargs)
+
+
+def _reduce_aggregated_class(cls: ExtendableMeta) -> Tuple[Any, Tuple[str]]:
+    """Reduce an aggregated class to its name into the registry.
+
+    The aggregated classes can't be retrieved by their module and name. They
+    are pickled as a reference to the class of the same name into the registry
+    of the unpickling context. Since the classes are memoized by pickle, the
+    class of the instances pickled together is looked up only once.
+    """
+    if cls.__dict__.get("__xreg_ancestors__") is None:
+        raise pickle.PicklingError(
+            f"Can't pickle {cls}: it's not the final class of an extendable "
+            "class hierarchy"
+        )
+    return _get_aggregated_class, (cls.__xreg_name__,)
+
+
+def _get_aggregated_class(name: str) -> ExtendableMeta:
+    """Return the aggregated class of the given name from the current registry."""
+    registry = extendable_registry.get()
+    if not registry:
+        raise RegistryNotInitializedError(
+            "Extendable classes registry is not initialized"
+        )
+    return registry[name]
+
+
+_aggregated_metaclasses: Dict[Type[ExtendableMeta], Type[ExtendableMeta]] = {
+    ExtendableMeta: AggregatedExtendableMeta
+}
+copyreg.pickle(AggregatedExtendableMeta, _reduce_aggregated_class)
@@ -0,0 +1,116 @@
+"""A pool of initialized registries shared by the callers requiring the same
+modules."""
+
+import collections
+import sys
+import threading
+from typing import Callable, List, Optional, Tuple
+
+if sys.version_info >= (3, 7):
+    from typing import OrderedDict
+else:
+    from typing_extensions import OrderedDict
+
+from . import main
+from .registry import ExtendableClassesRegistry
+
+
+class ExtendableRegistryPool:
+    """Keep the initialized registries by list of loaded modules.
+
+    A registry is returned for a list of module matchings. The
+    expressions are resolved into the list of modules to load and if a
+    registry has already been built for the same list of modules, this
+    registry is returned. Otherwise a new registry is built and added
+    into the pool.
+
+    When the pool contains more than ``max_registries`` registries or
+    when the approximate memory used by the registries exceeds
+    ``max_bytes``, the least recently used registries are evicted. The
+    last registry returned is never evicted.
+
+    The :meth:`ExtendableRegistryListener.on_registry_created` and
+    :meth:`ExtendableRegistryListener.on_registry_evicted` hooks are
+    called when a registry is added into or evicted from the pool.
+
+    When ``close_evicted`` is True, the evicted registries are closed to
+    release their classes. It must only be enabled if the evicted
+    registries are no more used by the callers.
+    """
+
+    def __init__(
+        self,
+        max_registries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        registry_factory: Callable[
+            [], ExtendableClassesRegistry
+        ] = ExtendableClassesRegistry,
+        close_evicted: bool = False,
+    ) -> None:
+        self.max_registries = max_registries
+        self.max_bytes = max_bytes
+        self.close_evicted = close_evicted
+        self.registry_factory = registry_factory
+        self._registries: OrderedDict[
+            Tuple[str, ...], Tuple[ExtendableClassesRegistry, int]
+        ] = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._registries)
+
+    def get(
+        self, module_matchings: Optional[List[str]] = None
+    ) -> ExtendableClassesRegistry:
+        """Return an initialized registry for the given module matchings."""
+        module_matchings = module_matchings or ["*"]
+        key = tuple(main._resolve_modules(module_matchings))
+        with self._lock:
+            entry = self._registries.get(key)
+            if entry is not None:
+                self._registries.move_to_end(key)
+                return entry[0]
+        # the registry is built outside the lock to not block the callers
+        # requiring other registries
+        registry = self.registry_factory()
+        # an empty list of modules would load all the modules, the matchings
+        # resolving to no module are given as is
+        registry.init_registry(list(key) or module_matchings)
+        size = registry.footprint()["bytes"] if self.max_bytes else 0
+        with self._lock:
+            entry = self._registries.get(key)
+            if entry is not None:
+                # the same registry has been built concurrently
+                self._registries.move_to_end(key)
+                return entry[0]
+            self._registries[key] = (registry, size)
+            self._bytes += size
+            for listener in registry.listeners:
+                listener.on_registry_created(registry)
+            self._evict()
+        return registry
+
+    def clear(self) -> None:
+        """Evict all the registries from the pool."""
+        with self._lock:
+            while self._registries:
+                self._evict_lru()
+
+    def _evict(self) -> None:
+        while len(self._registries) > 1 and (
+            (
+                self.max_registries is not None
+                and len(self._registries) > self.max_registries
+            )
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._evict_lru()
+
+    def _evict_lru(self) -> None:
+        _key, (registry, size) = self._registries.popitem(last=False)
+        self._bytes -= size
+        for listener in registry.listeners:
+            listener.on_registry_evicted(registry)
+        if self.close_evicted:
+            registry.close()
@@ -1,11 +1,118 @@
-import sqlite3
+import collections
+import functools
+import gc
+import itertools
+import sys
+import threading
+import time
 import types
+import weakref
 from contextlib import contextmanager
-from typing import Any, Dict, Iterator, List, Optional, Set, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 from . import main
+from .exceptions import RegistryFrozenError, RegistryNotInitializedError
 from .utils import LastOrderedSet
 
+# generations are unique among all the registries so that a generation
+# identifies both a registry and a state of this registry
+_generations = itertools.count(1)
+_generations_lock = threading.Lock()
+
+
+_T = TypeVar("_T")
+
+# the keys of a class namespace preventing to merge the class with the next
+# levels of its hierarchy in flatten mode
+_UNMERGEABLE_KEYS = frozenset(
+    (
+        "__slots__",
+        "__init_subclass__",
+        "__annotations__",
+        "__annotate__",
+        "__annotate_func__",
+    )
+)
+
+
+# the aggregated classes shared by the registries created with
+# ``share_classes=True``, by structural key (see ``_shared_class_key``)
+_shared_classes: "weakref.WeakValueDictionary[Tuple[Any, ...], type]" = (
+    weakref.WeakValueDictionary()
+)
+_shared_classes_lock = threading.Lock()
+
+
+def _shared_class_key(
+    metaclass: type,
+    qualname: str,
+    final: bool,
+    cls_defs: Iterable[main.ExtendableClassDef],
+    bases: Iterable[type],
+    kwargs: Any,
+) -> Optional[Tuple[Any, ...]]:
+    """Return the key identifying the aggregated class built from the given
+    levels of a hierarchy on the given bases, or None if the class can't be
+    shared.
+
+    The bases are referenced by id to not keep alive the classes of the
+    closed registries. The bases of a shared class must therefore be
+    checked before its reuse since an id can be reused once the class is
+    garbage collected.
+    """
+    key = (
+        metaclass,
+        qualname,
+        final,
+        tuple(cls_def.original_cls for cls_def in cls_defs),
+        tuple(map(id, bases)),
+        tuple(sorted(kwargs.items())),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        # unhashable class keyword arguments
+        return None
+    return key
+
+
+def _get_shared_class(key: Tuple[Any, ...], bases: Tuple[type, ...]) -> Any:
+    cls = _shared_classes.get(key)
+    # a class created without bases inherits from object
+    bases = bases or (object,)
+    if cls is None or len(cls.__bases__) != len(bases):
+        return None
+    if any(a is not b for a, b in zip(cls.__bases__, bases)):
+        return None
+    return cls
+
+
+def _next_generation() -> int:
+    with _generations_lock:
+        return next(_generations)
+
+
+def _run_steps(steps: Generator[None, None, _T]) -> _T:
+    """Run a step-wise operation to completion and return its result."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return cast(_T, e.value)
+
 
 class ExtendableRegistryListener:
     def on_registry_initialized(
@@ -27,6 +134,81 @@ class ExtendableRegistryListener:
         """
         ...
 
+    def on_registry_created(self, registry: "ExtendableClassesRegistry") -> None:
+        """Called when a registry is built and added into a registry pool."""
+        ...
+
+    def on_registry_evicted(self, registry: "ExtendableClassesRegistry") -> None:
+        """Called when a registry is evicted from a registry pool."""
+        ...
+
+    def on_modules_resolved(
+        self,
+        registry: "ExtendableClassesRegistry",
+        modules: List[str],
+        duration: float,
+    ) -> None:
+        """Called when the module matchings are resolved into the list of
+        modules to load.
+
+        The ``duration`` is given in seconds.
+        """
+        ...
+
+    def on_module_loaded(
+        self,
+        registry: "ExtendableClassesRegistry",
+        module: str,
+        class_names: List[str],
+        duration: float,
+    ) -> None:
+        """Called when the class definitions of a module are loaded into the
+        registry.
+
+        ``class_names`` are the names of the extendable classes defined or
+        extended by the module.
+        """
+        ...
+
+    def before_build_extendable_class(
+        self,
+        registry: "ExtendableClassesRegistry",
+        class_def: "main.ExtendableClassDef",
+    ) -> None:
+        """Called before the aggregated class of a class definition is built."""
+        ...
+
+    def on_extendable_class_built(
+        self,
+        registry: "ExtendableClassesRegistry",
+        class_def: "main.ExtendableClassDef",
+        cls: "main.ExtendableMeta",
+        levels: int,
+        new_classes: int,
+        duration: float,
+    ) -> None:
+        """Called when the aggregated class of a class definition is built.
+
+        ``levels`` is the number of levels into the class hierarchy and
+        ``new_classes`` the number of classes created to build it.
+        """
+        ...
+
+    def on_registry_phase_done(
+        self,
+        registry: "ExtendableClassesRegistry",
+        phase: str,
+        duration: float,
+    ) -> None:
+        """Called at the end of each phase of the registry initialization.
+
+        The phases are ``resolve`` (module matchings resolution), ``load``
+        (class definitions loading), ``build`` (classes building) and
+        ``init`` (the whole initialization). :meth:`load_modules` reports the
+        ``resolve``, ``load`` and ``build`` phases.
+        """
+        ...
+
 
 class ExtendableClassesRegistry:
     """Store all the extendableClasses and allow to retrieve them by name.
@@ -36,41 +218,286 @@ class ExtendableClassesRegistry:
 
     The :attr:`ready` attribute must be set to ``True`` when all the extendable classes
     are loaded.
+
+    In ``lazy`` mode, :meth:`init_registry` only loads and checks the class
+    definitions. Each class is built with its bases the first time it is
+    requested.
+
+    In ``flatten`` mode, consecutive levels of a class hierarchy are merged
+    into a single aggregated class when the merge doesn't change the
+    behaviour of the class: the merged level only extends the class itself,
+    doesn't use the zero argument ``super()``, doesn't define ``__slots__``,
+    annotations or ``__init_subclass__`` and the class creation is not
+    customized by its metaclass or by the bases of the class.
+
+    With ``share_classes``, the aggregated classes are shared with the other
+    registries created with ``share_classes=True``: an aggregated class is
+    reused when it's built from the same original classes on the same
+    bases. Registries loading the same sub-hierarchies (e.g. one registry
+    by tenant) then share the same class objects.
     """
 
     listeners: List[ExtendableRegistryListener] = []
 
-    def __init__(self) -> None:
+    def __init__(
+        self, lazy: bool = False, flatten: bool = False, share_classes: bool = False
+    ) -> None:
         self._extendable_classes: Dict[str, main.ExtendableMeta] = {}
         self._loaded_modules: Set[str] = set()
         self.ready: bool = False
+        self.frozen: bool = False
+        self.lazy = lazy
+        self.flatten = flatten
+        self.share_classes = share_classes
         self._extendable_class_defs: Dict[str, main.ExtendableClassDef] = {}
+        self._generation: int = _next_generation()
+        # lock held while the registry is built
+        self._lock = threading.RLock()
+        # True while the registry is initialized. The lock is re-entrant and
+        # an asynchronous initialization gives the control back to the event
+        # loop while holding it: the other tasks of the loop run into the
+        # same thread and would otherwise re-enter the build.
+        self._initializing = False
+        # cache of the methods to call for the classmethods wrapped on the
+        # original classes, by (original class, method name)
+        self._class_methods: Dict[
+            Tuple[main.ExtendableMeta, str], Callable[..., Any]
+        ] = {}
+        # memoized results of issubclass(subclass, cls) by (cls, subclass) when
+        # subclass is an original extendable class
+        self._subclass_checks: Dict[Tuple[main.ExtendableMeta, type], bool] = {}
 
     def __getitem__(self, key: str) -> main.ExtendableMeta:
-        return self._extendable_classes[key]
+        try:
+            return self._extendable_classes[key]
+        except KeyError:
+            if not self.lazy or key not in self._extendable_class_defs:
+                raise
+        return self._build_lazily(key)
 
     def __setitem__(self, key: str, value: main.ExtendableMeta) -> None:
+        if self.frozen:
+            raise RegistryFrozenError("A frozen registry can't be modified")
         self._extendable_classes[key] = value
+        self._invalidate_caches()
 
     def __contains__(self, key: str) -> bool:
-        return key in self._extendable_classes
+        return key in self._extendable_classes or (
+            self.lazy and key in self._extendable_class_defs
+        )
 
     def get(self, key: str, default: Any = ...) -> main.ExtendableMeta:
-        return self._extendable_classes.get(key, default)
+        try:
+            return self[key]
+        except KeyError:
+            return cast(main.ExtendableMeta, default)
+
+    def bind(self, cls: main.ExtendableMeta) -> main.ExtendableMeta:
+        """Return the aggregated class of the given extendable class into the
+        registry.
+
+        The returned class can be instantiated directly in place of the given
+        class, without looking up the registry at each instantiation. It's
+        the class of the registry until the registry is rebuilt.
+        """
+        return self[cls.__xreg_name__]
 
     def __iter__(self) -> Iterator[str]:
-        return self._extendable_classes.__iter__()
+        if not self.lazy:
+            return self._extendable_classes.__iter__()
+        return itertools.chain(
+            self._extendable_class_defs,
+            (
+                key
+                for key in self._extendable_classes
+                if key not in self._extendable_class_defs
+            ),
+        )
+
+    def _build_lazily(self, name: str) -> main.ExtendableMeta:
+        """Build the requested class and its missing bases."""
+        with self._lock, self.build_mode():
+            self._check_not_initializing()
+            classes = self._extendable_classes
+            if name in classes:
+                # built concurrently
+                return classes[name]
+            # since the bases are inserted before the classes depending on
+            # them, the classes can be inserted directly into the registry
+            for class_def in self._resolve_dependencies(name):
+                if class_def.name not in classes:
+                    self.build_extendable_class(class_def, classes)
+            return classes[name]
+
+    def _resolve_dependencies(self, name: str) -> List[main.ExtendableClassDef]:
+        """Return the class definition of the given class preceded by the class
+        definitions of all its bases into build order."""
+        class_defs = self._extendable_class_defs
+        dependencies: List[main.ExtendableClassDef] = []
+        visited = {name}
+        stack = [(class_defs[name], iter(class_defs[name].base_names))]
+        while stack:
+            class_def, bases = stack[-1]
+            for base in bases:
+                if base not in visited:
+                    visited.add(base)
+                    stack.append((class_defs[base], iter(class_defs[base].base_names)))
+                    break
+            else:
+                stack.pop()
+                dependencies.append(class_def)
+        return dependencies
+
+    def _invalidate_caches(self) -> None:
+        """Drop the caches depending on the content of the registry.
+
+        The generation of the registry is renewed so that the caches
+        kept by the classes are also invalidated.
+        """
+        self._generation = _next_generation()
+        self._class_methods.clear()
+        self._subclass_checks.clear()
+
+    def _resolve_class_method(
+        self, cls: main.ExtendableMeta, method_name: str, func: Callable[..., Any]
+    ) -> Callable[..., Any]:
+        """Resolve the method to call when the classmethod ``method_name`` is called
+        on the original class ``cls``.
+
+        The method of the aggregated class is returned if the class is
+        into the registry. Otherwise the initial function is returned
+        bound to the original class. The result is cached until the
+        registry is modified.
+        """
+        assembled_cls = self.get(cls.__xreg_name__, None)
+        if assembled_cls is None:
+            target: Callable[..., Any] = functools.partial(func, cls)
+        else:
+            target = getattr(assembled_cls, method_name)
+        if not self.frozen:
+            self._class_methods[(cls, method_name)] = target
+        return target
+
+    def footprint(self) -> Dict[str, int]:
+        """Return an approximation of the memory used by the aggregated classes of
+        the registry.
+
+        The returned dict contains the number of ``classes`` into the
+        registry, the number of aggregated classes built for all the
+        ``hierarchy_levels`` and their approximate size in ``bytes``.
+        """
+        seen: Set[int] = set()
+        size = 0
+        classes = self._extendable_classes
+        for cls in classes.values():
+            for klass in cls.__mro__:
+                if id(klass) in seen or not klass.__dict__.get("_is_aggregated_class"):
+                    continue
+                seen.add(id(klass))
+                size += sys.getsizeof(klass) + sys.getsizeof(dict(klass.__dict__))
+        return {"classes": len(classes), "hierarchy_levels": len(seen), "bytes": size}
+
+    def close(self) -> None:
+        """Release the aggregated classes, the class definitions and the caches
+        of the registry.
+
+        The registry is no more ready once closed and can be initialized
+        again. The original classes don't keep any strong reference to
+        the aggregated classes, which are therefore garbage collected once
+        no more referenced by instances or by the callers.
+        """
+        with self._lock:
+            self._check_not_initializing()
+            self.ready = False
+            self.frozen = False
+            self._extendable_class_defs = {}
+            self._loaded_modules = set()
+            self._publish({})
+
+    def freeze(self, gc_freeze: bool = False) -> None:
+        """Freeze the registry once initialized.
+
+        All the classes not yet built in lazy mode are built and the caches
+        kept by the original classes and by the registry to resolve the
+        assembled classes and the classmethods are populated. The classes of
+        the registry are then exposed as a read-only mapping and the caches
+        are no more modified: processes forked once the registry is frozen
+        share the memory used by the registry.
+
+        If ``gc_freeze`` is True, :func:`gc.freeze` is called to move all
+        the objects tracked by the garbage collector into the permanent
+        generation, so that the collections into the forked processes don't
+        touch them.
+
+        A frozen registry can't be modified anymore, only closed.
+        """
+        if not self.ready:
+            raise RegistryNotInitializedError(
+                "Extendable classes registry must be initialized before being frozen"
+            )
+        with self._lock, self.build_mode():
+            self._check_not_initializing()
+            if not self.frozen:
+                classes = dict(self._extendable_classes)
+                if self.lazy:
+                    for class_def in self._resolve_build_order():
+                        if class_def.name not in classes:
+                            self.build_extendable_class(class_def, classes)
+                self._publish(
+                    cast(
+                        Dict[str, main.ExtendableMeta], types.MappingProxyType(classes)
+                    )
+                )
+                self._populate_caches()
+                self.frozen = True
+        if gc_freeze and hasattr(gc, "freeze"):
+            gc.freeze()
+
+    def _populate_caches(self) -> None:
+        """Populate the caches of the assembled classes kept by the original
+        classes and the cache of the classmethods."""
+        generation = self._generation
+        for class_def in self._extendable_class_defs.values():
+            assembled_cls = self._extendable_classes[class_def.name]
+            cache = (generation, weakref.ref(assembled_cls))
+            for cls_def in class_def.hierarchy:
+                original_cls = cast(main.ExtendableMeta, cls_def.original_cls)
+                original_cls.__xreg_cache__ = cache
+                resolved: Set[str] = set()
+                for klass in original_cls.__mro__:
+                    for name, value in klass.__dict__.items():
+                        func = getattr(value, "__func__", None)
+                        if name in resolved or not hasattr(func, "__xreg_func__"):
+                            continue
+                        resolved.add(name)
+                        self._resolve_class_method(
+                            original_cls, name, func.__xreg_func__  # type: ignore
+                        )
 
-    def load_extendable_classes(self, module: str) -> None:
+    def __enter__(self) -> "ExtendableClassesRegistry":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def load_extendable_classes(self, module: str) -> List[str]:
+        """Load the class definitions declared into the given module.
+
+        Return the names of the loaded class definitions.
+        """
         if module in self._loaded_modules:
-            return
-        for cls_def in main._extendable_class_defs_by_module.get(module, []):
+            return []
+        names = []
+        # iterate over a copy since classes could be declared concurrently
+        for cls_def in list(main._extendable_class_defs_by_module.get(module, [])):
             self.load_extendable_class_def(cls_def.clone())
+            names.append(cls_def.name)
         self._loaded_modules.add(module)
+        return names
 
     def load_extendable_class_def(self, cls_def: main.ExtendableClassDef) -> None:
         parents = cls_def.base_names
-        if cls_def.name in self and not parents:
+        if cls_def.name in self._extendable_classes and not parents:
             raise TypeError(
                 f"extendable {cls_def.name} (in class def {cls_def}) already exists."
             )
@@ -81,43 +508,187 @@ class ExtendableClassesRegistry:
             class_def.add_child(cls_def)
 
     def build_extendable_classes(self) -> None:
-        """, We iterate over all the class definitions and build the final hierarchy."""
-        # we first check that all bases are defined
-        for class_def in self._extendable_class_defs.values():
+        """Build the final hierarchy of all the class definitions.
+
+        Each class is built once, after all its bases. The classes are built
+        aside and published at once into the registry when they are all built.
+        """
+        _run_steps(self._build_extendable_classes_steps())
+
+    def _build_extendable_classes_steps(self) -> Generator[None, None, None]:
+        """Step-wise version of :meth:`build_extendable_classes` yielding after
+        each class build."""
+        classes = dict(self._extendable_classes)
+        for class_def in self._resolve_build_order():
+            self.build_extendable_class(class_def, classes)
+            yield
+        self._publish(classes)
+
+    def _publish(self, classes: Dict[str, main.ExtendableMeta]) -> None:
+        """Replace the classes of the registry by the given ones.
+
+        The replacement is atomic: concurrent readers see either the
+        previous classes or the new ones, never a partially built
+        registry.
+        """
+        self._extendable_classes = classes
+        self._invalidate_caches()
+
+    def _resolve_build_order(self) -> List[main.ExtendableClassDef]:
+        """Sort the class definitions so that each class comes after its bases.
+
+        The dependency graph is built from the ``base_names`` of the class
+        definitions. Classes without dependency between them keep the order in
+        which they were loaded.
+        """
+        class_defs = self._extendable_class_defs
+        dependents: Dict[str, List[str]] = {name: [] for name in class_defs}
+        pending_bases: Dict[str, int] = {}
+        for name, class_def in class_defs.items():
+            count = 0
             for base in class_def.base_names:
-                if base not in self._extendable_class_defs:
+                if base == name:
+                    continue
+                if base not in class_defs:
                     raise TypeError(
-                        f"extendable class '{class_def.name}' inherits from"
+                        f"extendable class '{name}' inherits from "
                         f"undefined base '{base}'"
                     )
-        to_build = self._extendable_class_defs.items()
-        while to_build:
-            remaining = []
-            for name, class_def in self._extendable_class_defs.items():
-                if not class_def.is_mixed_bases:
-                    self.build_extendable_class(class_def)
-                    continue
-                # Generate only class with all the bases into the registry
-                all_in_registry = True
-                for base in class_def.base_names:
-                    if base == name:
-                        continue
-                    if base not in self:
-                        all_in_registry = False
-                        break
-                if all_in_registry:
-                    self.build_extendable_class(class_def)
+                dependents[base].append(name)
+                count += 1
+            pending_bases[name] = count
+        ready = collections.deque(
+            name for name, count in pending_bases.items() if not count
+        )
+        build_order = []
+        while ready:
+            name = ready.popleft()
+            build_order.append(class_defs[name])
+            for dependent in dependents[name]:
+                pending_bases[dependent] -= 1
+                if not pending_bases[dependent]:
+                    ready.append(dependent)
+        if len(build_order) != len(class_defs):
+            cycle = self._find_cycle(
+                [name for name, count in pending_bases.items() if count]
+            )
+            raise TypeError(
+                "cyclic inheritance between extendable classes: "
+                + " -> ".join(f"'{name}'" for name in cycle)
+            )
+        return build_order
+
+    def _find_cycle(self, names: List[str]) -> List[str]:
+        """Return a cycle from the given class names that can't be built."""
+        remaining = set(names)
+        path: List[str] = []
+        name = names[0]
+        while name not in path:
+            path.append(name)
+            name = next(
+                base
+                for base in self._extendable_class_defs[name].base_names
+                if base != name and base in remaining
+            )
+        return path[path.index(name) :] + [name]
+
+    def load_modules(self, module_matchings: List[str]) -> Set[str]:
+        """Load the extendable classes declared into the given modules into an
+        initialized registry.
+
+        Only the classes defined or extended by the class definitions of the
+        new modules and the classes depending on them are rebuilt (or dropped to
+        be rebuilt on demand in lazy mode). All the other
+        classes into the registry are kept as is. The module list accept the
+        same expressions as :meth:`init_registry`. Modules already loaded are
+        ignored.
+
+        Return the names of the rebuilt classes.
+        """
+        if not self.ready:
+            raise RegistryNotInitializedError(
+                "Extendable classes registry must be initialized before "
+                "loading new modules"
+            )
+        if self.frozen:
+            raise RegistryFrozenError("A frozen registry can't load new modules")
+        with self._lock, self.build_mode(), self._restore_class_defs_on_error():
+            self._check_not_initializing()
+            rebuilt = _run_steps(self._load_resolved_modules_steps(module_matchings))
+            if not rebuilt:
+                return rebuilt
+            phase_start = time.perf_counter()
+            build_order = []
+            for class_def in self._resolve_build_order():
+                if class_def.name not in rebuilt and not any(
+                    base in rebuilt for base in class_def.base_names
+                ):
                     continue
-                remaining.append((name, class_def))
-            to_build = remaining  # type: ignore
+                # the build order ensures that the dependencies of a class
+                # are all marked as rebuilt before the class itself
+                rebuilt.add(class_def.name)
+                build_order.append(class_def)
+            classes = {
+                name: cls
+                for name, cls in self._extendable_classes.items()
+                if name not in rebuilt
+            }
+            if not self.lazy:
+                for class_def in build_order:
+                    self.build_extendable_class(class_def, classes)
+            self._publish(classes)
+            self._notify_phase_done("build", phase_start)
+        return rebuilt
+
+    @contextmanager
+    def _restore_class_defs_on_error(self) -> Iterator[None]:
+        """Restore the loaded modules and the class definitions of the registry
+        if an error occurs into the block.
+
+        The hierarchy and the base names of the loaded class definitions are
+        extended in place by the class definitions of the new modules.
+        """
+        loaded_modules = set(self._loaded_modules)
+        class_defs = dict(self._extendable_class_defs)
+        hierarchies = [
+            (class_def, class_def.hierarchy, class_def.base_names)
+            for class_def in class_defs.values()
+        ]
+        try:
+            yield
+        except BaseException:
+            for class_def, hierarchy, base_names in hierarchies:
+                class_def.hierarchy = hierarchy
+                class_def.base_names = base_names
+            self._extendable_class_defs = class_defs
+            self._loaded_modules = loaded_modules
+            raise
 
     def build_extendable_class(
-        self, class_def: main.ExtendableClassDef
+        self,
+        class_def: main.ExtendableClassDef,
+        classes: Optional[Dict[str, main.ExtendableMeta]] = None,
     ) -> main.ExtendableMeta:
         """Build the class hierarchy from the first one to the last one into the
-        hierarchy definition."""
+        hierarchy definition.
+
+        The bases are looked up and the final class is stored into the given
+        ``classes`` mapping if any, into the registry otherwise.
+        """
         name = class_def.name
-        for idx, cls_def in enumerate(class_def.hierarchy):
+        start = time.perf_counter()
+        for listener in self.listeners:
+            listener.before_build_extendable_class(self, class_def)
+        built_classes = self._extendable_classes if classes is None else classes
+        new_classes = 0
+        base: Optional[main.ExtendableMeta] = None
+        # the transitive closure of the ids of the extendable classes the
+        # final class inherits from
+        ancestors = {class_def.namespace["__xreg_id__"]}
+        hierarchy = class_def.hierarchy
+        idx = 0
+        while idx < len(hierarchy):
+            cls_def = hierarchy[idx]
             # retrieve extendable_parent
             # determine all the classes the component should inherit from
             bases = LastOrderedSet[main.ExtendableMeta]()
@@ -125,52 +696,173 @@ class ExtendableClassesRegistry:
                 # the base_names contains all the bases for the final aggregated
                 # class. Here we check that all the base required to build the
                 # current hierarchy are already build.
-                if base_name not in self:
-                    if idx != 0 or base_name != cls_def.name:
-                        raise TypeError(
-                            f"Pydnatic class '{name}' extends an non-existing "
-                            f"extendable class '{base_name}'."
-                        )
-                elif base_name in cls_def.original_base_names:
+                if base_name == name:
+                    # the parent class is the previous class into the hierarchy
+                    parent_class = base
+                elif base_name not in built_classes:
+                    raise TypeError(
+                        f"Extendable class '{name}' extends an non-existing "
+                        f"extendable class '{base_name}'."
+                    )
+                else:
+                    parent_class = built_classes[base_name]
+                if (
+                    parent_class is not None
+                    and base_name in cls_def.original_base_names
+                ):
                     # The bases to inherit for the current class are the one
                     # defined into the original class definition.
-                    parent_class = self[base_name]
                     bases.add(parent_class)
             for other_base in class_def.others_bases:
                 bases.add(other_base)
+            for _base in bases:
+                ancestors.update(getattr(_base, "__xreg_ancestors__", None) or ())
+            merged = (
+                self._mergeable_levels(hierarchy, idx, bases) if self.flatten else ()
+            )
+            if merged:
+                idx += len(merged)
+                last_cls_def = merged[-1]
+            else:
+                last_cls_def = cls_def
             simple_name = name.split(".")[-1]
             uniq_class_name = f"{simple_name}{idx}"
-            namespace = cls_def.namespace
-            namespace.update(
-                {
-                    "__qualname__": uniq_class_name,
-                    "_is_aggregated_class": True,
-                    "_original_cls": cls_def.original_cls,
-                }
-            )
-            extendableClass = types.new_class(
-                simple_name,
-                tuple(bases),
-                kwds=dict(class_def.kwargs, metaclass=cls_def.metaclass),
-                exec_body=(
-                    lambda ns, namespace=namespace: ns.update(namespace)  # type: ignore
-                ),
-            )
+            final = idx + 1 == len(hierarchy)
+            overlay = {
+                "__qualname__": uniq_class_name,
+                "_is_aggregated_class": True,
+                "_original_cls": last_cls_def.original_cls,
+                # popped by the metaclass
+                "__xreg_final__": final,
+            }
+            metaclass = cls_def.metaclass._get_aggregated_metaclass()
+            class_bases = tuple(bases)
+            share_key = None
+            extendableClass = None
+            if self.share_classes:
+                share_key = _shared_class_key(
+                    metaclass,
+                    uniq_class_name,
+                    final,
+                    (cls_def,) + merged,
+                    class_bases,
+                    class_def.kwargs,
+                )
+                if share_key is not None:
+                    with _shared_classes_lock:
+                        extendableClass = _get_shared_class(share_key, class_bases)
+            if extendableClass is None:
+                extendableClass = self._new_aggregated_class(
+                    simple_name,
+                    cls_def,
+                    merged,
+                    overlay,
+                    class_bases,
+                    metaclass,
+                    class_def.kwargs,
+                )
+                new_classes += 1
+                if share_key is not None:
+                    with _shared_classes_lock:
+                        _shared_classes[share_key] = extendableClass
             base = cast(main.ExtendableMeta, extendableClass)
+            idx += 1
+        base = cast(main.ExtendableMeta, base)
+        base.__xreg_ancestors__ = frozenset(ancestors)
+        if classes is None:
             self[name] = base
-        base.__xreg_all_base_names__ = set(class_def.base_names)
-        for _base in bases:
-            if hasattr(_base, "__xreg_all_base_names__"):
-                base.__xreg_all_base_names__ |= _base.__xreg_all_base_names__
+        else:
+            classes[name] = base
+        if self.listeners:
+            duration = time.perf_counter() - start
+            for listener in self.listeners:
+                listener.on_extendable_class_built(
+                    self,
+                    class_def,
+                    base,
+                    len(class_def.hierarchy),
+                    new_classes,
+                    duration,
+                )
         return base
 
+    def _new_aggregated_class(
+        self,
+        name: str,
+        cls_def: main.ExtendableClassDef,
+        merged: Tuple[main.ExtendableClassDef, ...],
+        overlay: Dict[str, Any],
+        bases: Tuple[type, ...],
+        metaclass: type,
+        kwargs: Any,
+    ) -> type:
+        """Create the aggregated class of the level ``cls_def`` of a hierarchy
+        merged with the ``merged`` levels."""
+        namespace = cls_def.build_namespace(**overlay)
+        if merged:
+            for merged_cls_def in merged:
+                namespace.update(merged_cls_def.namespace)
+            # the docstring is not inherited
+            namespace["__doc__"] = merged[-1].namespace.get("__doc__")
+            namespace.update(overlay)
+        return types.new_class(
+            name,
+            bases,
+            kwds=dict(kwargs, metaclass=metaclass),
+            exec_body=(
+                lambda ns, namespace=namespace: ns.update(namespace)  # type: ignore
+            ),
+        )
+
+    def _mergeable_levels(
+        self,
+        hierarchy: Tuple[main.ExtendableClassDef, ...],
+        idx: int,
+        bases: Iterable[type],
+    ) -> Tuple[main.ExtendableClassDef, ...]:
+        """Return the levels following the level ``idx`` of the hierarchy that
+        can be merged into the class built for this level with the given
+        bases."""
+        cls_def = hierarchy[idx]
+        metaclass: Any = cls_def.metaclass
+        if (
+            idx + 1 == len(hierarchy)
+            or metaclass.__new__ is not main.ExtendableMeta.__new__
+            or metaclass.__init__ is not main.ExtendableMeta.__init__
+            or not _UNMERGEABLE_KEYS.isdisjoint(cls_def.namespace)
+            or any(
+                "__init_subclass__" in klass.__dict__
+                for _base in bases
+                for klass in _base.__mro__
+                if klass is not object
+            )
+        ):
+            return ()
+        merged = []
+        for next_cls_def in hierarchy[idx + 1 :]:
+            if (
+                next_cls_def.metaclass is not metaclass
+                or next_cls_def.original_base_names != (cls_def.name,)
+                or "__classcell__" in next_cls_def.namespace
+                or not _UNMERGEABLE_KEYS.isdisjoint(next_cls_def.namespace)
+            ):
+                break
+            merged.append(next_cls_def)
+        return tuple(merged)
+
     @contextmanager
     def build_mode(self) -> Iterator[None]:
-        main._registry_build_mode = True
+        """Enable the build mode in the current context.
+
+        The build mode is scoped to the current context so that the
+        classes declared by other threads while the registry is built
+        are collected as expected.
+        """
+        token = main._registry_build_mode.set(True)
         try:
             yield
         finally:
-            main._registry_build_mode = False
+            main._registry_build_mode.reset(token)
 
     def init_registry(self, module_matchings: Optional[List[str]] = None) -> None:
         """Build the extendable classes by aggregating the classes declared in the given
@@ -179,53 +871,115 @@ class ExtendableClassesRegistry:
         module list given, build the aggregated classes for all the modules loaded by
         the metaclass in the same order as the loading process.
 
-        The module list accept wildcard expression as last character
+        The module list accept wildcard expression as last character. An expression
+        starting with ``!`` excludes the matching modules.
         """
-        module_matchings = module_matchings if module_matchings else ["*"]
-        for listener in self.listeners:
-            listener.before_init_registry(self, module_matchings)
-        with self.build_mode(), ModuleIndex() as idx:
-            for match in module_matchings:
-                for module in idx.get_modules(match):
-                    self.load_extendable_classes(module)
-            self.build_extendable_classes()
-            for listener in self.listeners:
-                listener.on_registry_initialized(self)
-        self.ready = True
+        _run_steps(self._init_registry_steps(module_matchings))
 
+    async def init_registry_async(
+        self,
+        module_matchings: Optional[List[str]] = None,
+        time_slice: float = 0.01,
+    ) -> None:
+        """Asynchronous version of :meth:`init_registry` cooperating with the
+        asyncio event loop.
 
-class ModuleIndex:
-    def __enter__(self) -> "ModuleIndex":
-        self._conn = sqlite3.connect(":memory:")
-        self.__init_modules_index__()
-        return self
+        The initialization is done step by step, a step being the load of a
+        module or the build of a class. The control is given back to the event
+        loop each time the steps have been running for more than
+        ``time_slice`` seconds. The classes are published into the registry
+        at once when they are all built, the tasks using the registry in the
+        meantime see the previous classes.
 
-    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        if self._conn:
-            self._conn.close()
+        The registry can't be initialized, closed, frozen, extended with new
+        modules or build a class lazily from another task of the event loop
+        while it's being initialized: a RuntimeError is raised.
+        """
+        import asyncio
 
-    def __init_modules_index__(self) -> None:
-        """Create an SQL table used to get the a list of module from a matching
-        expression using wildcard character.
+        steps = self._init_registry_steps(module_matchings)
+        try:
+            deadline = time.perf_counter() + time_slice
+            for _step in steps:
+                if time.perf_counter() >= deadline:
+                    await asyncio.sleep(0)
+                    deadline = time.perf_counter() + time_slice
+        finally:
+            # release the lock and leave the build mode if cancelled
+            steps.close()
 
-        Thanks to the idx column we always return the list of module
-        into the same order as the initial loading order
-        """
-        self._conn.execute(
-            """
-            CREATE TABLE modules (
-                name TEXT not null PRIMARY KEY,
-                idx INTEGER not null
+    def _init_registry_steps(
+        self, module_matchings: Optional[List[str]] = None
+    ) -> Generator[None, None, None]:
+        """Step-wise initialization of the registry, yielding after each module
+        load and each class build."""
+        if self.frozen:
+            raise RegistryFrozenError("A frozen registry can't be initialized")
+        module_matchings = module_matchings if module_matchings else ["*"]
+        start = time.perf_counter()
+        for listener in self.listeners:
+            listener.before_init_registry(self, module_matchings)
+        with self._lock, self.build_mode():
+            self._check_not_initializing()
+            self._initializing = True
+            try:
+                yield from self._load_resolved_modules_steps(module_matchings)
+                phase_start = time.perf_counter()
+                if self.lazy:
+                    # check the class definitions, the classes are built on
+                    # demand
+                    self._resolve_build_order()
+                    self._publish({})
+                else:
+                    yield from self._build_extendable_classes_steps()
+                self._notify_phase_done("build", phase_start)
+                for listener in self.listeners:
+                    listener.on_registry_initialized(self)
+                self.ready = True
+            finally:
+                self._initializing = False
+        self._notify_phase_done("init", start)
+
+    def _check_not_initializing(self) -> None:
+        if self._initializing:
+            raise RuntimeError(
+                "The registry can't be modified while it's being initialized"
             )
+
+    def _load_resolved_modules_steps(
+        self, module_matchings: List[str]
+    ) -> Generator[None, None, Set[str]]:
+        """Resolve the module matchings and load the class definitions of the
+        resolved modules, yielding after each module load.
+
+        Return the names of the classes defined or extended by the loaded
+        modules.
         """
-        )
-        records = (
-            (m, idx)
-            for idx, m in enumerate(main._extendable_class_defs_by_module.keys())
-        )
-        self._conn.executemany("INSERT INTO modules VALUES (?, ?)", records)
+        start = time.perf_counter()
+        modules = main._resolve_modules(module_matchings)
+        end = time.perf_counter()
+        for listener in self.listeners:
+            listener.on_modules_resolved(self, modules, end - start)
+        self._notify_phase_done("resolve", start, end)
+        loaded: Set[str] = set()
+        phase_start = time.perf_counter()
+        for module in modules:
+            start = time.perf_counter()
+            class_names = self.load_extendable_classes(module)
+            if self.listeners:
+                duration = time.perf_counter() - start
+                for listener in self.listeners:
+                    listener.on_module_loaded(self, module, class_names, duration)
+            loaded.update(class_names)
+            yield
+        self._notify_phase_done("load", phase_start)
+        return loaded
 
-    def get_modules(self, module_matching: str) -> List[str]:
-        query = "SELECT name from modules where name like ? order by idx ASC"
-        result = self._conn.execute(query, [module_matching.replace("*", "%")])
-        return [r[0] for r in result.fetchall()]
+    def _notify_phase_done(
+        self, phase: str, start: float, end: Optional[float] = None
+    ) -> None:
+        if not self.listeners:
+            return
+        duration = (time.perf_counter() if end is None else end) - start
+        for listener in self.listeners:
+            listener.on_registry_phase_done(self, phase, duration)
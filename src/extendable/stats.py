@@ -0,0 +1,172 @@
+"""A registry listener collecting the timings of the registries
+initialization."""
+
+import threading
+import weakref
+from typing import Any, Dict, List, MutableMapping, Optional
+
+from . import main
+from .registry import ExtendableClassesRegistry, ExtendableRegistryListener
+
+
+class ExtendableClassStats:
+    """Build statistics of an extendable class."""
+
+    __slots__ = ("name", "levels", "new_classes", "duration")
+
+    def __init__(
+        self, name: str, levels: int, new_classes: int, duration: float
+    ) -> None:
+        self.name = name
+        self.levels = levels
+        self.new_classes = new_classes
+        self.duration = duration
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "levels": self.levels,
+            "new_classes": self.new_classes,
+            "duration": self.duration,
+        }
+
+
+class ModuleStats:
+    """Load statistics of a module."""
+
+    __slots__ = ("name", "class_names", "duration")
+
+    def __init__(self, name: str, class_names: List[str], duration: float) -> None:
+        self.name = name
+        self.class_names = class_names
+        self.duration = duration
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "class_names": list(self.class_names),
+            "duration": self.duration,
+        }
+
+
+class RegistryStats:
+    """Timings collected while a registry is initialized.
+
+    Durations are given in seconds. The phase durations are accumulated
+    when the phase is run more than once (e.g. by
+    :meth:`~extendable.registry.ExtendableClassesRegistry.load_modules`).
+    """
+
+    def __init__(self) -> None:
+        self.modules_resolved: List[str] = []
+        self.phases: Dict[str, float] = {}
+        self.modules: Dict[str, ModuleStats] = {}
+        self.classes: Dict[str, ExtendableClassStats] = {}
+
+    @property
+    def new_classes(self) -> int:
+        """The number of classes created to build the extendable classes."""
+        return sum(stats.new_classes for stats in self.classes.values())
+
+    def slowest_classes(self, limit: int = 10) -> List[ExtendableClassStats]:
+        return sorted(
+            self.classes.values(), key=lambda stats: stats.duration, reverse=True
+        )[:limit]
+
+    def slowest_modules(self, limit: int = 10) -> List[ModuleStats]:
+        return sorted(
+            self.modules.values(), key=lambda stats: stats.duration, reverse=True
+        )[:limit]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON serializable dict."""
+        return {
+            "modules_resolved": list(self.modules_resolved),
+            "phases": dict(self.phases),
+            "new_classes": self.new_classes,
+            "modules": [stats.as_dict() for stats in self.modules.values()],
+            "classes": [stats.as_dict() for stats in self.classes.values()],
+        }
+
+
+class RegistryStatsListener(ExtendableRegistryListener):
+    """Collect the :class:`RegistryStats` of the registries.
+
+    The listener must be added to the registry listeners::
+
+        listener = RegistryStatsListener()
+        ExtendableClassesRegistry.listeners.append(listener)
+        registry.init_registry()
+        logger.info("registry stats: %s", listener.get_stats(registry).as_dict())
+
+    The statistics of a registry are reset each time the registry is
+    initialized and are released with the registry.
+    """
+
+    def __init__(self) -> None:
+        self._stats: MutableMapping[ExtendableClassesRegistry, RegistryStats] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def get_stats(self, registry: ExtendableClassesRegistry) -> Optional[RegistryStats]:
+        """Return the statistics collected for the given registry, if any."""
+        return self._stats.get(registry)
+
+    def _get_or_create_stats(
+        self, registry: ExtendableClassesRegistry
+    ) -> RegistryStats:
+        with self._lock:
+            stats = self._stats.get(registry)
+            if stats is None:
+                stats = self._stats[registry] = RegistryStats()
+            return stats
+
+    def before_init_registry(
+        self,
+        registry: ExtendableClassesRegistry,
+        module_matchings: Optional[List[str]] = None,
+    ) -> None:
+        with self._lock:
+            self._stats[registry] = RegistryStats()
+
+    def on_modules_resolved(
+        self,
+        registry: ExtendableClassesRegistry,
+        modules: List[str],
+        duration: float,
+    ) -> None:
+        self._get_or_create_stats(registry).modules_resolved.extend(modules)
+
+    def on_module_loaded(
+        self,
+        registry: ExtendableClassesRegistry,
+        module: str,
+        class_names: List[str],
+        duration: float,
+    ) -> None:
+        self._get_or_create_stats(registry).modules[module] = ModuleStats(
+            module, class_names, duration
+        )
+
+    def on_extendable_class_built(
+        self,
+        registry: ExtendableClassesRegistry,
+        class_def: main.ExtendableClassDef,
+        cls: main.ExtendableMeta,
+        levels: int,
+        new_classes: int,
+        duration: float,
+    ) -> None:
+        self._get_or_create_stats(registry).classes[class_def.name] = (
+            ExtendableClassStats(class_def.name, levels, new_classes, duration)
+        )
+
+    def on_registry_phase_done(
+        self,
+        registry: ExtendableClassesRegistry,
+        phase: str,
+        duration: float,
+    ) -> None:
+        phases = self._get_or_create_stats(registry).phases
+        phases[phase] = phases.get(phase, 0.0) + duration
@@ -1,5 +1,18 @@
+import bisect
+import re
 from collections import OrderedDict
-from typing import Generic, Iterator, MutableSet, Optional, Tuple, TypeVar
+from typing import (
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    MutableSet,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 T = TypeVar("T")
 
@@ -36,3 +49,82 @@ class LastOrderedSet(OrderedSet[T], Generic[T]):
     def add(self, elem: T) -> None:
         OrderedSet.discard(self, elem)
         OrderedSet.add(self, elem)
+
+
+class ModuleIndex:
+    """An index of module names used to get the list of modules matching an
+    expression using the wildcard character ``*``.
+
+    The names are kept sorted to find the modules sharing a prefix by
+    bisection. Modules are always returned in the order they were added
+    into the index.
+    """
+
+    __slots__ = ["_names", "_positions"]
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._names: List[str] = []
+        self._positions: Dict[str, int] = {}
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, name: str) -> None:
+        if name in self._positions:
+            return
+        self._positions[name] = len(self._positions)
+        bisect.insort(self._names, name)
+
+    def get_modules(self, module_matching: str) -> List[str]:
+        """Return the modules matching the given expression in the order they were
+        added into the index."""
+        if "*" not in module_matching:
+            return [module_matching] if module_matching in self._positions else []
+        prefix, _, suffix = module_matching.partition("*")
+        pattern = None
+        if suffix:
+            pattern = re.compile(
+                ".*".join(re.escape(part) for part in module_matching.split("*"))
+            )
+        names = self._names
+        modules = []
+        for idx in range(bisect.bisect_left(names, prefix), len(names)):
+            name = names[idx]
+            if not name.startswith(prefix):
+                break
+            if pattern is None or pattern.fullmatch(name):
+                modules.append(name)
+        modules.sort(key=self._positions.__getitem__)
+        return modules
+
+    def resolve(self, module_matchings: Iterable[str]) -> List[str]:
+        """Return the modules matching the given list of expressions.
+
+        The modules are returned in the order of the expressions and,
+        for a same expression, in the order they were added into the
+        index. A module is returned only once. Expressions starting with
+        ``!`` exclude the matching modules from the result whatever
+        their position in the list.
+        """
+        includes = []
+        excluded: Set[str] = set()
+        for module_matching in module_matchings:
+            if module_matching.startswith("!"):
+                excluded.update(self.get_modules(module_matching[1:]))
+            else:
+                includes.append(module_matching)
+        modules = []
+        for module_matching in includes:
+            for module in self.get_modules(module_matching):
+                if module not in excluded:
+                    excluded.add(module)
+                    modules.append(module)
+        return modules
@@ -3,19 +3,22 @@ import sys
 
 import pytest
 
-from extendable import context, main, registry
+from extendable import context, main, registry, utils
 
 
 @pytest.fixture
 def test_registry() -> registry.ExtendableClassesRegistry:
     reg = registry.ExtendableClassesRegistry()
     initial_class_defs = main._extendable_class_defs_by_module
+    initial_modules_index = main._modules_index
     try:
         main._extendable_class_defs_by_module = collections.OrderedDict()
+        main._modules_index = utils.ModuleIndex()
         token = context.extendable_registry.set(reg)
         yield reg
     finally:
         main._extendable_class_defs_by_module = initial_class_defs
+        main._modules_index = initial_modules_index
         context.extendable_registry.reset(token)
 
 
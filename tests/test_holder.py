@@ -0,0 +1,57 @@
+"""Test registry holder."""
+
+import asyncio
+import gc
+import weakref
+
+import pytest
+
+from extendable import context
+from extendable.exceptions import RegistryNotInitializedError
+from extendable.holder import ExtendableRegistryHolder
+from extendable.registry import ExtendableClassesRegistry
+
+
+def test_holder_rebuild(test_registry, sys_modules_cleanup):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+    import tests.mod_ext2  # NOQA isort:skip
+
+    holder = ExtendableRegistryHolder()
+    assert holder.registry is None
+    assert holder.generation == 0
+    with pytest.raises(RegistryNotInitializedError):
+        holder.current()
+    with pytest.raises(RegistryNotInitializedError):
+        holder.publish(ExtendableClassesRegistry())
+    assert holder.rebuild(["tests.mod_base.*", "tests.mod_ext1.*"]) == 1
+    with holder.use() as registry:
+        assert context.extendable_registry.get() is registry
+        assert Base().test() == "mod1.base"
+        # the requests in progress keep the registry they started with
+        assert holder.rebuild(["tests.mod_*"]) == 2
+        assert Base().test() == "mod1.base"
+        with holder.use():
+            assert Base().test() == "mod2.mod1.base"
+        assert Base().test() == "mod1.base"
+    assert context.extendable_registry.get() is test_registry
+    assert holder.current() == (holder.registry, 2)
+    # the previous registry is released once no more used
+    registry_ref = weakref.ref(registry)
+    del registry
+    gc.collect()
+    assert registry_ref() is None
+
+
+def test_holder_rebuild_async(test_registry, sys_modules_cleanup):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+
+    holder = ExtendableRegistryHolder()
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(holder.rebuild_async(time_slice=0)) == 1
+    finally:
+        loop.close()
+    with holder.use():
+        assert Base().test() == "mod1.base"
@@ -0,0 +1,66 @@
+"""Test pickling of extendable instances."""
+
+import pickle
+
+import pytest
+
+from extendable import ExtendableMeta, context, main
+from extendable.exceptions import RegistryNotInitializedError
+from extendable.registry import ExtendableClassesRegistry
+
+
+def test_pickle(test_registry, sys_modules_cleanup, mocker):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+    import tests.mod_ext2  # NOQA isort:skip
+
+    test_registry.init_registry(["tests.mod_base.*", "tests.mod_ext1.*"])
+    instances = [Base() for _i in range(10)]
+    instances[0].value = 1
+    data = pickle.dumps(instances)
+    get_aggregated_class = mocker.spy(main, "_get_aggregated_class")
+    loaded = pickle.loads(data)
+    # the class is looked up once for all the instances
+    get_aggregated_class.assert_called_once_with(Base.__xreg_name__)
+    assert loaded[0].value == 1
+    assert type(loaded[0]) is test_registry[Base.__xreg_name__]
+    assert loaded[1].test() == "mod1.base"
+
+    # the instances are unpickled against the current registry
+    other_registry = ExtendableClassesRegistry()
+    other_registry.init_registry(["tests.mod_base.*", "tests.mod_ext2.*"])
+    token = context.extendable_registry.set(other_registry)
+    try:
+        instance = pickle.loads(pickle.dumps(instances[0]))
+    finally:
+        context.extendable_registry.reset(token)
+    assert type(instance) is other_registry[Base.__xreg_name__]
+    assert instance.value == 1
+    assert instance.test() == "mod2.base"
+
+    token = context.extendable_registry.set(None)
+    try:
+        with pytest.raises(RegistryNotInitializedError):
+            pickle.loads(data)
+    finally:
+        context.extendable_registry.reset(token)
+
+
+def test_pickle_custom_reduce(test_registry):
+    class A(metaclass=ExtendableMeta):
+        def __init__(self, value: int) -> None:
+            self.value = value
+
+        def __reduce__(self):
+            return type(self), (self.value * 2,)
+
+    class AExt(A, extends=A):
+        pass
+
+    test_registry.init_registry()
+    assert pickle.loads(pickle.dumps(A(1))).value == 2
+    # only the final classes of the hierarchies can be pickled
+    intermediate_cls = test_registry[A.__xreg_name__].__bases__[0]
+    assert intermediate_cls._original_cls is A
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(intermediate_cls)
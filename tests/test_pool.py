@@ -0,0 +1,98 @@
+"""Test registry pool."""
+
+import pytest
+
+from extendable.pool import ExtendableRegistryPool
+from extendable.registry import ExtendableClassesRegistry, ExtendableRegistryListener
+
+
+@pytest.fixture
+def listener(mocker):
+    listener = ExtendableRegistryListener()
+    mocker.patch.object(listener, "on_registry_created")
+    mocker.patch.object(listener, "on_registry_evicted")
+    listeners = ExtendableClassesRegistry.listeners
+    ExtendableClassesRegistry.listeners = listeners + [listener]
+    try:
+        yield listener
+    finally:
+        ExtendableClassesRegistry.listeners = listeners
+
+
+def test_pool_shared_registry(test_registry, sys_modules_cleanup, listener):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+    import tests.mod_ext2  # NOQA isort:skip
+
+    pool = ExtendableRegistryPool()
+    registry = pool.get(["tests.mod_base.*", "tests.mod_ext1.*"])
+    assert registry.ready
+    listener.on_registry_created.assert_called_once_with(registry)
+    # the same list of modules gives the same registry
+    assert pool.get(["tests.mod_base.base", "tests.mod_ext1.*"]) is registry
+    assert pool.get(["tests.mod_*", "!tests.mod_ext2.*"]) is registry
+    assert len(pool) == 1
+    other_registry = pool.get(["tests.mod_*"])
+    assert other_registry is not registry
+    assert len(pool) == 2
+    assert registry[Base.__xreg_name__]().test() == "mod1.base"
+    assert other_registry[Base.__xreg_name__]().test() == "mod2.mod1.base"
+    listener.on_registry_evicted.assert_not_called()
+
+
+def test_pool_eviction(test_registry, sys_modules_cleanup, listener):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+    import tests.mod_ext2  # NOQA isort:skip
+
+    pool = ExtendableRegistryPool(max_registries=2)
+    registry_1 = pool.get(["tests.mod_base.*"])
+    registry_2 = pool.get(["tests.mod_base.*", "tests.mod_ext1.*"])
+    # registry_1 becomes the most recently used one
+    assert pool.get(["tests.mod_base.*"]) is registry_1
+    registry_3 = pool.get(["tests.mod_base.*", "tests.mod_ext2.*"])
+    listener.on_registry_evicted.assert_called_once_with(registry_2)
+    assert len(pool) == 2
+    assert pool.get(["tests.mod_base.*"]) is registry_1
+    assert pool.get(["tests.mod_base.*", "tests.mod_ext2.*"]) is registry_3
+
+    pool.clear()
+    assert len(pool) == 0
+    assert listener.on_registry_evicted.call_count == 3
+
+
+def test_pool_max_bytes(test_registry, sys_modules_cleanup, listener):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+
+    pool = ExtendableRegistryPool(max_bytes=1)
+    registry_1 = pool.get(["tests.mod_base.*"])
+    # the last registry is never evicted
+    assert len(pool) == 1
+    pool.get(["tests.mod_*"])
+    listener.on_registry_evicted.assert_called_once_with(registry_1)
+    assert len(pool) == 1
+
+
+def test_pool_close_evicted(test_registry, sys_modules_cleanup, listener):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+
+    pool = ExtendableRegistryPool(max_registries=1, close_evicted=True)
+    registry_1 = pool.get(["tests.mod_base.*"])
+    registry_2 = pool.get(["tests.mod_*"])
+    listener.on_registry_evicted.assert_called_once_with(registry_1)
+    assert not registry_1.ready
+    assert Base.__xreg_name__ not in registry_1
+    assert registry_2[Base.__xreg_name__]().test() == "mod1.base"
+
+
+def test_pool_no_module(test_registry, sys_modules_cleanup, listener):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+
+    pool = ExtendableRegistryPool()
+    # matchings resolving to no module give an empty registry
+    registry = pool.get(["tests.nonexistent.*"])
+    assert registry.ready
+    assert Base.__xreg_name__ not in registry
+    assert not registry._loaded_modules
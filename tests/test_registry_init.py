@@ -1,5 +1,15 @@
 """Test registry loading."""
 
+import asyncio
+import concurrent.futures
+import gc
+import threading
+import weakref
+
+import pytest
+
+from extendable import ExtendableMeta, context, main
+from extendable.exceptions import RegistryFrozenError, RegistryNotInitializedError
 from extendable.registry import ExtendableClassesRegistry, ExtendableRegistryListener
 
 
@@ -90,3 +100,568 @@ def test_init_registry_listener(test_registry, mocker):
         listener.on_registry_initialized.assert_called_with(test_registry)
     finally:
         ExtendableClassesRegistry.listeners = listeners
+
+
+def test_build_order(test_registry, mocker):
+    """Each class is built once and after its bases."""
+
+    class C(metaclass=ExtendableMeta):
+        pass
+
+    class D(C):
+        pass
+
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class CExt(A, extends=C):
+        pass
+
+    spy = mocker.spy(test_registry, "build_extendable_class")
+    test_registry.init_registry()
+    built = [call.args[0].name for call in spy.call_args_list]
+    assert built == [A.__xreg_name__, C.__xreg_name__, D.__xreg_name__]
+    assert issubclass(D, A)
+
+
+def test_build_undefined_base(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    # only load the definition of B
+    class_defs = main._extendable_class_defs_by_module[__name__]
+    test_registry.load_extendable_class_def(class_defs[1].clone())
+    with pytest.raises(TypeError, match="inherits from undefined base"):
+        test_registry.build_extendable_classes()
+
+
+def test_build_cyclic_inheritance(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    class AExt(B, extends=A):
+        pass
+
+    with pytest.raises(TypeError, match="cyclic inheritance"):
+        test_registry.init_registry()
+
+
+def test_init_registry_excluded_modules(test_registry, sys_modules_cleanup):
+    """Ensure that the excluded modules are not loaded into the registry."""
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+    import tests.mod_ext2  # NOQA isort:skip
+
+    test_registry.init_registry(["tests.mod_*", "!tests.mod_ext1.*"])
+    assert Base().test() == "mod2.base"
+
+
+def test_load_modules(test_registry, sys_modules_cleanup):
+    """Ensure that only the classes impacted by the new modules are rebuilt."""
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+    import tests.mod_ext2  # NOQA isort:skip
+
+    class Child(Base):
+        pass
+
+    class Other(metaclass=ExtendableMeta):
+        pass
+
+    test_registry.init_registry(["tests.mod_base.*", "tests.mod_ext1.*", __name__])
+    assert Child().test() == "mod1.base"
+    child_cls = type(Child())
+    other_cls = type(Other())
+
+    rebuilt = test_registry.load_modules(["tests.mod_*"])
+    assert rebuilt == {Base.__xreg_name__, Child.__xreg_name__}
+    assert Base().test() == "mod2.mod1.base"
+    assert Child().test() == "mod2.mod1.base"
+    assert type(Child()) is not child_cls
+    assert type(Other()) is other_cls
+
+    # modules are loaded only once
+    assert not test_registry.load_modules(["tests.mod_ext2.*"])
+
+
+def test_load_modules_error(test_registry):
+    """A module failing to load leaves the registry unchanged."""
+
+    class A(metaclass=ExtendableMeta):
+        def v(self) -> str:
+            return "a"
+
+    class Missing(metaclass=ExtendableMeta):
+        __module__ = "tests.missing_mod"
+
+    class AExt(A, extends=A):
+        __module__ = "tests.broken_mod"
+
+        def v(self) -> str:
+            return "ext"
+
+    class C(Missing):
+        __module__ = "tests.broken_mod"
+
+    class B(metaclass=ExtendableMeta):
+        __module__ = "tests.other_mod"
+
+    test_registry.init_registry([__name__])
+    class_def = test_registry._extendable_class_defs[A.__xreg_name__]
+    with pytest.raises(TypeError):
+        test_registry.load_modules(["tests.broken_mod"])
+    assert len(class_def.hierarchy) == 1
+    assert C.__xreg_name__ not in test_registry._extendable_class_defs
+    assert "tests.broken_mod" not in test_registry._loaded_modules
+    assert test_registry.load_modules(["tests.other_mod"]) == {B.__xreg_name__}
+    assert A().v() == "a"
+    # the module is loaded again and fails again
+    with pytest.raises(TypeError):
+        test_registry.load_modules(["tests.broken_mod"])
+
+
+def test_load_modules_not_initialized(test_registry):
+    with pytest.raises(RegistryNotInitializedError):
+        test_registry.load_modules(["tests.mod_ext2.*"])
+
+
+def test_build_mode_scoped_to_context(test_registry):
+    """Classes declared by another thread while a registry is built are collected."""
+    declared = []
+
+    def declare():
+        class A(metaclass=ExtendableMeta):
+            pass
+
+        declared.append(A)
+
+    with test_registry.build_mode():
+        thread = threading.Thread(target=declare)
+        thread.start()
+        thread.join()
+    class_defs = main._extendable_class_defs_by_module[__name__]
+    assert [class_def.original_cls for class_def in class_defs] == declared
+
+
+def test_publish_built_classes(test_registry, mocker):
+    """The classes are published into the registry once they are all built."""
+
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    build_extendable_class = test_registry.build_extendable_class
+
+    def check_not_published(*args, **kwargs):
+        assert not list(test_registry)
+        return build_extendable_class(*args, **kwargs)
+
+    spy = mocker.patch.object(
+        test_registry, "build_extendable_class", side_effect=check_not_published
+    )
+    test_registry.init_registry()
+    assert spy.call_count == 2
+    assert set(test_registry) == {A.__xreg_name__, B.__xreg_name__}
+
+
+def test_concurrent_init_registry(test_registry, sys_modules_cleanup):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+
+    def build(_idx):
+        registry = ExtendableClassesRegistry()
+        registry.init_registry(["tests.mod_*"])
+        return registry
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        registries = list(executor.map(build, range(8)))
+    for registry in registries:
+        assert registry.ready
+        assert issubclass(registry[Base.__xreg_name__], Base)
+
+
+def test_lazy_init_registry(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    class C(metaclass=ExtendableMeta):
+        pass
+
+    class AExt(A, extends=A):
+        pass
+
+    lazy_registry = ExtendableClassesRegistry(lazy=True)
+    lazy_registry.init_registry()
+    assert lazy_registry.ready
+    assert not lazy_registry._extendable_classes
+    assert B.__xreg_name__ in lazy_registry
+    assert set(lazy_registry) == {A.__xreg_name__, B.__xreg_name__, C.__xreg_name__}
+
+    token = context.extendable_registry.set(lazy_registry)
+    try:
+        b = B()
+        # only B and its bases are built
+        assert set(lazy_registry._extendable_classes) == {
+            A.__xreg_name__,
+            B.__xreg_name__,
+        }
+        assert isinstance(b, AExt)
+        assert type(b) is lazy_registry[B.__xreg_name__]
+        assert isinstance(C(), C)
+    finally:
+        context.extendable_registry.reset(token)
+
+
+def test_lazy_init_registry_redeclared_class(test_registry):
+    """Lazy and eager registries load the same class definitions."""
+
+    def declare():
+        class A(metaclass=ExtendableMeta):
+            def value(self) -> str:
+                return "a"
+
+        return A
+
+    # e.g. a module executed twice
+    declare()
+    A = declare()
+    eager_registry = ExtendableClassesRegistry()
+    eager_registry.init_registry()
+    lazy_registry = ExtendableClassesRegistry(lazy=True)
+    lazy_registry.init_registry()
+    for reg in (eager_registry, lazy_registry):
+        assert len(reg._extendable_class_defs[A.__xreg_name__].hierarchy) == 2
+        assert reg[A.__xreg_name__]().value() == "a"
+
+
+def test_lazy_load_modules(test_registry, sys_modules_cleanup):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+
+    lazy_registry = ExtendableClassesRegistry(lazy=True)
+    lazy_registry.init_registry(["tests.mod_base.*"])
+    base_cls = lazy_registry[Base.__xreg_name__]
+    assert lazy_registry.load_modules(["tests.mod_ext1.*"]) == {Base.__xreg_name__}
+    # the class is dropped from the registry and rebuilt on demand
+    assert not lazy_registry._extendable_classes
+    assert lazy_registry[Base.__xreg_name__] is not base_cls
+    assert len(lazy_registry._extendable_class_defs[Base.__xreg_name__].hierarchy) == 2
+
+
+def test_registries_share_frozen_class_defs(test_registry):
+    class A(metaclass=ExtendableMeta):
+        def value(self) -> str:
+            return "a"
+
+        @classmethod
+        def cls_value(cls) -> str:
+            return "a"
+
+        @property
+        def prop(self) -> str:
+            return "a"
+
+    class AExt(A, extends=A):
+        def value(self) -> str:
+            return super().value() + "ext"
+
+        @classmethod
+        def cls_value(cls) -> str:
+            return super().cls_value() + "ext"
+
+        @property
+        def prop(self) -> str:
+            return super().prop + "ext"
+
+    class_def = main._extendable_class_defs_by_module[__name__][-1]
+    namespace = dict(class_def.namespace)
+    test_registry.init_registry()
+    other_registry = ExtendableClassesRegistry()
+    other_registry.init_registry()
+    # the class definitions are not modified by the registries
+    assert dict(class_def.namespace) == namespace
+    with pytest.raises(TypeError):
+        class_def.namespace["_is_aggregated_class"] = True
+    # each registry binds the zero argument super() to its own classes
+    for reg in (test_registry, other_registry):
+        a = reg[A.__xreg_name__]()
+        assert a.value() == "aext"
+        assert a.prop == "aext"
+        assert type(a).cls_value() == "aext"
+    assert test_registry[A.__xreg_name__] is not other_registry[A.__xreg_name__]
+
+
+def test_close(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class AExt(A, extends=A):
+        pass
+
+    class B(A):
+        pass
+
+    other_registry = ExtendableClassesRegistry()
+    other_registry.init_registry()
+    assert other_registry.footprint()["classes"] == 2
+    assert other_registry.footprint()["hierarchy_levels"] == 3
+    assert other_registry.footprint()["bytes"] > 0
+    token = context.extendable_registry.set(other_registry)
+    try:
+        a = A()
+        assert issubclass(B, A)
+    finally:
+        context.extendable_registry.reset(token)
+    assembled_a = weakref.ref(type(a))
+    del a
+    generation = other_registry._generation
+    with other_registry:
+        pass
+    assert not other_registry.ready
+    assert other_registry._generation != generation
+    assert other_registry.footprint() == {
+        "classes": 0,
+        "hierarchy_levels": 0,
+        "bytes": 0,
+    }
+    assert not other_registry._extendable_class_defs
+    assert not other_registry._subclass_checks
+    # the original classes don't keep the aggregated classes alive
+    gc.collect()
+    assert assembled_a() is None
+    # a closed registry can be initialized again
+    other_registry.init_registry()
+    assert isinstance(other_registry[A.__xreg_name__](), AExt)
+
+
+def test_freeze(test_registry, mocker):
+    class A(metaclass=ExtendableMeta):
+        @classmethod
+        def name(cls) -> str:
+            return "a"
+
+    class AExt(A, extends=A):
+        @classmethod
+        def name(cls) -> str:
+            return super().name() + "ext"
+
+    class B(A):
+        pass
+
+    lazy_registry = ExtendableClassesRegistry(lazy=True)
+    lazy_registry.init_registry()
+    gc_freeze = mocker.patch("gc.freeze")
+    lazy_registry.freeze(gc_freeze=True)
+    gc_freeze.assert_called_once_with()
+    assert lazy_registry.frozen
+    # all the classes are built and the caches are populated
+    assert set(lazy_registry._extendable_classes) == {
+        A.__xreg_name__,
+        B.__xreg_name__,
+    }
+    for cls in (A, AExt, B):
+        generation, assembled_cls_ref = cls.__xreg_cache__
+        assert generation == lazy_registry._generation
+        assert assembled_cls_ref() is lazy_registry[cls.__xreg_name__]
+    assert (B, "name") in lazy_registry._class_methods
+    # the registry and its caches are no more modified
+    with pytest.raises(RegistryFrozenError):
+        lazy_registry[A.__xreg_name__] = lazy_registry[B.__xreg_name__]
+    with pytest.raises(RegistryFrozenError):
+        lazy_registry.load_modules([__name__])
+    with pytest.raises(RegistryFrozenError):
+        lazy_registry.init_registry()
+    class_methods = dict(lazy_registry._class_methods)
+    token = context.extendable_registry.set(lazy_registry)
+    try:
+        assert B.name() == "aext"
+        assert isinstance(B(), AExt)
+        assert issubclass(B, AExt)
+        assert not issubclass(int, A)
+    finally:
+        context.extendable_registry.reset(token)
+    assert lazy_registry._class_methods == class_methods
+    assert not lazy_registry._subclass_checks
+
+
+def _run_async(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_init_registry_async(test_registry):
+    class A(metaclass=ExtendableMeta):
+        def value(self) -> str:
+            return "a"
+
+    class AExt(A, extends=A):
+        def value(self) -> str:
+            return super().value() + "ext"
+
+    class B(A):
+        pass
+
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(main._registry_build_mode.get())
+            await asyncio.sleep(0)
+
+    async def init():
+        ticker_task = asyncio.ensure_future(ticker())
+        await test_registry.init_registry_async(time_slice=0)
+        ticker_task.cancel()
+
+    _run_async(init())
+    assert test_registry.ready
+    # the event loop ran the other tasks during the initialization, outside
+    # of the build mode
+    assert len(ticks) > 1
+    assert not any(ticks)
+    assert test_registry[B.__xreg_name__]().value() == "aext"
+    assert isinstance(test_registry[B.__xreg_name__](), AExt)
+
+
+def test_init_registry_async_cancelled(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    async def init():
+        task = asyncio.ensure_future(test_registry.init_registry_async(time_slice=0))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    _run_async(init())
+    assert not test_registry.ready
+    assert not main._registry_build_mode.get()
+    # the lock has been released
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(test_registry._lock.acquire, blocking=False).result()
+
+
+def test_init_registry_async_reentered(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    async def init():
+        task = asyncio.ensure_future(test_registry.init_registry_async(time_slice=0))
+        await asyncio.sleep(0)
+        # the other tasks of the loop run into the thread holding the lock
+        with pytest.raises(RuntimeError):
+            test_registry.init_registry()
+        with pytest.raises(RuntimeError):
+            await test_registry.init_registry_async(time_slice=0)
+        with pytest.raises(RuntimeError):
+            test_registry.close()
+        await task
+
+    _run_async(init())
+    assert test_registry.ready
+    assert isinstance(test_registry[B.__xreg_name__](), A)
+    # the registry can be initialized again once initialized
+    test_registry.init_registry()
+
+
+def test_flatten(test_registry):
+    class A(metaclass=ExtendableMeta):
+        """A"""
+
+        def value(self) -> str:
+            return "a"
+
+        def name(self) -> str:
+            return "a"
+
+    class AExt1(A, extends=A):
+        def name(self) -> str:
+            return "ext1"
+
+    class AExt2(A, extends=A):
+        def other(self) -> str:
+            return "other"
+
+    class AExt3(A, extends=A):
+        def value(self) -> str:
+            return super().value() + "ext3"
+
+    class AExt4(A, extends=A):
+        __slots__ = ()
+
+    class B(A):
+        pass
+
+    registry = ExtendableClassesRegistry(flatten=True)
+    registry.init_registry()
+    test_registry.init_registry()
+    a_cls = registry[A.__xreg_name__]
+    # A, AExt1 and AExt2 are merged, the levels using super() or
+    # defining __slots__ are kept
+    assert a_cls.__qualname__ == test_registry[A.__xreg_name__].__qualname__
+    assert [klass.__qualname__ for klass in a_cls.__mro__[:-1]] == [
+        "A4",
+        "A3",
+        "A2",
+    ]
+    assert a_cls.__mro__[2].__doc__ is None
+    assert a_cls.__mro__[2]._is_aggregated_class
+    assert a_cls.__mro__[2]._original_cls is AExt2
+    for reg in (registry, test_registry):
+        b = reg[B.__xreg_name__]()
+        assert (b.value(), b.name(), b.other()) == ("aext3", "ext1", "other")
+        assert isinstance(b, AExt1)
+        assert issubclass(reg[B.__xreg_name__], AExt2)
+    assert registry.footprint()["hierarchy_levels"] == 4
+    assert test_registry.footprint()["hierarchy_levels"] == 6
+
+
+def test_share_classes(test_registry, sys_modules_cleanup):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+    import tests.mod_ext2  # NOQA isort:skip
+
+    def init_registry(module_matchings, share_classes=True):
+        reg = ExtendableClassesRegistry(share_classes=share_classes)
+        reg.init_registry(module_matchings)
+        return reg[Base.__xreg_name__]
+
+    base_ext1 = init_registry(["tests.mod_base.*", "tests.mod_ext1.*"])
+    # the same hierarchy built on the same bases gives the same classes
+    assert init_registry(["tests.mod_base.*", "tests.mod_ext1.*"]) is base_ext1
+    assert init_registry(["tests.mod_*"]).__mro__[2] is base_ext1.__mro__[1]
+    assert init_registry(["tests.mod_*"]).__mro__[1] is not base_ext1
+    assert init_registry(["tests.mod_*"])().test() == "mod2.mod1.base"
+    # classes are only shared between registries created with share_classes
+    assert (
+        init_registry(["tests.mod_base.*", "tests.mod_ext1.*"], share_classes=False)
+        is not base_ext1
+    )
+    assert init_registry(["tests.mod_base.*"]) is not base_ext1.__mro__[1]
+    # shared classes are released with the last registry using them
+    base_ext1_ref = weakref.ref(base_ext1)
+    del base_ext1
+    gc.collect()
+    assert base_ext1_ref() is None
@@ -1,11 +1,17 @@
+import functools
+import inspect
+import sys
+from abc import ABCMeta
 from typing import Union
 
+import pytest
+
 try:
     from typing import Literal
 except ImportError:
     from typing_extensions import Literal
 
-from extendable import ExtendableMeta
+from extendable import ExtendableMeta, context, main, registry
 
 
 def test_simple_extends(test_registry):
@@ -351,3 +357,394 @@ def test_isinstance_no_extend(test_registry):
     assert isinstance(B(), B)
     assert isinstance(B(), A().__class__)
     assert isinstance(B(), B().__class__)
+
+
+def test_class_method_without_registry(test_registry):
+    class A(metaclass=ExtendableMeta):
+        @classmethod
+        def cls_name(cls) -> str:
+            return cls.__name__
+
+    token = context.extendable_registry.set(None)
+    try:
+        # no registry available, the initial method is called
+        assert A.cls_name() == "A"
+    finally:
+        context.extendable_registry.reset(token)
+    # the class is not into the registry, the initial method is called
+    assert A.cls_name() == "A"
+
+
+def test_class_method_dispatch_cache(test_registry):
+    class A(metaclass=ExtendableMeta):
+        @classmethod
+        def cls_value(cls, value: int) -> int:
+            return value
+
+    class AExt(A, extends=A):
+        @classmethod
+        def cls_value(cls, value: int) -> int:
+            return super().cls_value(value) + 1
+
+    test_registry.init_registry()
+    assert A.cls_value(1) == 2
+    assert (
+        test_registry._class_methods[(A, "cls_value")].__self__
+        is test_registry[A.__xreg_name__]
+    )
+
+    # the cache is reset when the registry is rebuilt
+    test_registry.init_registry()
+    assert not test_registry._class_methods
+    assert A.cls_value(value=2) == 3
+
+
+def test_class_method_strict_signature(test_registry, mocker):
+    class A(metaclass=ExtendableMeta):
+        @classmethod
+        def cls_value(cls, value: int) -> int:
+            return value
+
+    class AExt(A, extends=A):
+        @classmethod
+        def cls_value(cls, *args, **kwargs) -> int:
+            return 0
+
+    test_registry.init_registry()
+    assert A.cls_value(1, 2) == 0
+    mocker.patch.object(main, "strict_class_method_signature", True)
+    with pytest.raises(TypeError):
+        A.cls_value(1, 2)
+    assert A.cls_value(1) == 0
+    # the signature of the initial method is preserved
+    assert list(inspect.signature(A.cls_value).parameters) == ["value"]
+
+
+def test_assembled_cls_cache(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    test_registry.init_registry()
+    assembled_a = type(A())
+    generation, assembled_a_ref = A.__xreg_cache__
+    assert generation == test_registry._generation
+    assert assembled_a_ref() is assembled_a
+    # the cache of a parent class is never used for a child class
+    assert type(B()) is test_registry[B.__xreg_name__]
+    assert type(A()) is assembled_a
+
+    # the cache is invalidated when the registry is rebuilt
+    test_registry.init_registry()
+    assert type(A()) is not assembled_a
+    assert type(A()) is test_registry[A.__xreg_name__]
+
+    # the cache is invalidated when another registry is used
+    other_registry = registry.ExtendableClassesRegistry()
+    other_registry.init_registry()
+    token = context.extendable_registry.set(other_registry)
+    try:
+        assert type(A()) is other_registry[A.__xreg_name__]
+    finally:
+        context.extendable_registry.reset(token)
+    assert type(A()) is test_registry[A.__xreg_name__]
+
+
+def test_aggregated_metaclass(test_registry):
+    class MyMeta(ExtendableMeta):
+        pass
+
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A, metaclass=MyMeta):
+        pass
+
+    test_registry.init_registry()
+
+    aggregated_a = type(A())
+    aggregated_b = type(B())
+    assert type(aggregated_a) is main.AggregatedExtendableMeta
+    assert type(aggregated_a).__call__ is type.__call__
+    assert issubclass(type(aggregated_b), MyMeta)
+    assert issubclass(type(aggregated_b), main.AggregatedExtendableMeta)
+    assert type(aggregated_b)._get_aggregated_metaclass() is type(aggregated_b)
+    assert isinstance(aggregated_b(), A)
+    assert isinstance(aggregated_b(), B)
+    assert issubclass(aggregated_b, aggregated_a)
+
+
+def test_aggregated_metaclass_mixed_call(test_registry):
+    class CountingMeta(ABCMeta):
+        calls = 0
+
+        def __call__(cls, *args, **kwargs):
+            CountingMeta.calls += 1
+            instance = super().__call__(*args, **kwargs)
+            instance.tagged = True
+            return instance
+
+    class MixedMeta(ExtendableMeta, CountingMeta):
+        pass
+
+    class A(metaclass=MixedMeta):
+        pass
+
+    class AExt(A, extends=A):
+        pass
+
+    test_registry.init_registry()
+
+    a = A()
+    assert CountingMeta.calls == 1
+    assert a.tagged
+    assert isinstance(a, AExt)
+    # the metaclasses without __call__ keep the native type.__call__
+    assert main.AggregatedExtendableMeta.__call__ is type.__call__
+
+
+def test_isinstance_transitive_closure(test_registry):
+    class W(metaclass=ExtendableMeta):
+        pass
+
+    class X(W):
+        pass
+
+    class Y(metaclass=ExtendableMeta):
+        pass
+
+    class A(X):
+        pass
+
+    class AExt(Y, extends=A):
+        pass
+
+    test_registry.init_registry()
+
+    a = A()
+    # the last level of A doesn't inherit from the previous ones but A is
+    # still considered as a subclass of all the classes of its hierarchy
+    assert isinstance(a, Y)
+    assert isinstance(a, X)
+    assert isinstance(a, W)
+    assert issubclass(A, W)
+    assert not isinstance(Y(), A)
+    assert not issubclass(Y, A)
+    assert type(a).__xreg_ancestors__ == {cls.__xreg_id__ for cls in (W, X, Y, A)}
+    assert type(a).__xreg_all_base_names__ == {
+        W.__xreg_name__,
+        X.__xreg_name__,
+        Y.__xreg_name__,
+        A.__xreg_name__,
+    }
+
+
+def test_isinstance_original_class_instance(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    test_registry.init_registry()
+
+    # instances of the original classes are checked against their mro
+    assert isinstance(object.__new__(B), A)
+    assert not isinstance(object.__new__(A), B)
+    assert not isinstance(object(), A)
+
+
+def test_issubclass_memoized(test_registry, mocker):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A):
+        pass
+
+    test_registry.init_registry()
+
+    spy = mocker.spy(ExtendableMeta, "_subclasscheck")
+    assert issubclass(B, A)
+    assert not issubclass(A, B)
+    assert not issubclass(int, A)
+    call_count = spy.call_count
+    assert issubclass(B, A)
+    assert not issubclass(A, B)
+    assert spy.call_count == call_count
+    assert test_registry._subclass_checks[(A, B)] is True
+    assert test_registry._subclass_checks[(B, A)] is False
+    # the other classes are left to the ABCMeta caches
+    assert (A, int) not in test_registry._subclass_checks
+
+    # the memoized results are dropped when the registry is rebuilt
+    test_registry.init_registry()
+    assert not test_registry._subclass_checks
+    assert issubclass(B, A)
+    assert spy.call_count == call_count + 1
+
+
+def test_issubclass_virtual_subclass(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class X:
+        pass
+
+    test_registry.init_registry()
+    assert not issubclass(X, A)
+    A.register(X)
+    assert issubclass(X, A)
+
+
+def test_class_def_compact(test_registry):
+    class A(metaclass=ExtendableMeta):
+        pass
+
+    class B(A, extends=A):
+        pass
+
+    class_def_a = main._extendable_class_defs_by_module[__name__][-2]
+    assert not hasattr(class_def_a, "__dict__")
+    assert class_def_a.base_names == ()
+    assert class_def_a.kwargs is main._EMPTY_KWARGS
+
+    test_registry.init_registry()
+    class_def = test_registry._extendable_class_defs[A.__xreg_name__]
+    # the clones share the namespace and the bases of the declared class defs
+    assert class_def is not class_def_a
+    assert class_def.namespace is class_def_a.namespace
+    assert class_def.base_names == (A.__xreg_name__,)
+    assert len(class_def.hierarchy) == 2
+
+    footprint = main.class_defs_footprint()
+    assert footprint["class_defs"] == len(
+        [
+            cls_def
+            for cls_defs in main._extendable_class_defs_by_module.values()
+            for cls_def in cls_defs
+        ]
+    )
+    assert footprint["bytes"] > 0
+    registry_footprint = main.class_defs_footprint(
+        test_registry._extendable_class_defs.values()
+    )
+    assert registry_footprint["class_defs"] == 2
+    assert registry_footprint["namespaces"] == 2
+
+
+def test_super_in_wrapped_methods(test_registry):
+    def deco(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    class A(metaclass=ExtendableMeta):
+        def hello(self) -> str:
+            return "base"
+
+        def greet(self, prefix: str) -> str:
+            return prefix + "base"
+
+    class B(A):
+        @deco
+        def hello(self) -> str:
+            return "child+" + super().hello()
+
+        def _greet(self, prefix: str) -> str:
+            return prefix + "child+" + super().greet("")
+
+        greet = functools.partialmethod(_greet)
+
+    class BExt(B, extends=B):
+        def hello(self) -> str:
+            return "ext+" + super().hello()
+
+    # the references to the class cell are looked up on the first build
+    assert B not in main._class_cell_keys_cache
+    test_registry.init_registry()
+    # the decorated method can't be rebound, the declared cell is kept
+    assert main._class_cell_keys_cache[B] is None
+    b = B()
+    assert b.hello() == "ext+child+base"
+    assert b.greet("p:") == "p:child+base"
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 8), reason="functools.cached_property requires python 3.8"
+)
+def test_super_in_cached_property(test_registry):
+    class A(metaclass=ExtendableMeta):
+        @functools.cached_property
+        def cached(self) -> str:
+            return "base"
+
+    class B(A):
+        @functools.cached_property
+        def cached(self) -> str:
+            return "child+" + super().cached
+
+    class BExt(B, extends=B):
+        pass
+
+    test_registry.init_registry()
+    assert B().cached == "child+base"
+
+
+def test_create_many_and_bind(test_registry, mocker):
+    class A(metaclass=ExtendableMeta):
+        def __init__(self, a: int, b: int = 0) -> None:
+            self.a = a
+            self.b = b
+
+    class AExt(A, extends=A):
+        def total(self) -> int:
+            return self.a + self.b
+
+    test_registry.init_registry()
+    spy = mocker.spy(ExtendableMeta, "_get_assembled_cls")
+    instances = A.create_many([(1, 2), (3,), (5, 6)])
+    assert spy.call_count == 1
+    assert [instance.total() for instance in instances] == [3, 3, 11]
+    assert all(isinstance(instance, AExt) for instance in instances)
+    assembled_cls = test_registry.bind(A)
+    assert assembled_cls is test_registry[A.__xreg_name__]
+    assert assembled_cls.create_many([(1, 1)])[0].total() == 2
+    assert test_registry.bind(AExt) is assembled_cls
+
+
+def test_build_aggregated_class_hook(test_registry):
+    built = []
+
+    class TrackingMeta(ExtendableMeta):
+        @classmethod
+        def _build_aggregated_class(metacls, name, bases, namespace, final, **kwargs):
+            new_cls = super()._build_aggregated_class(
+                name, bases, namespace, final, **kwargs
+            )
+            built.append((new_cls.__qualname__, final))
+            return new_cls
+
+    class A(metaclass=TrackingMeta):
+        pass
+
+    class AExt1(A, extends=A):
+        pass
+
+    class AExt2(A, extends=A):
+        pass
+
+    class B(A):
+        pass
+
+    test_registry.init_registry()
+    assert built == [("A0", False), ("A1", False), ("A2", True), ("B0", True)]
+    assert "__xreg_final__" not in test_registry[A.__xreg_name__].__dict__
+
+    built.clear()
+    flatten_registry = registry.ExtendableClassesRegistry(flatten=True)
+    flatten_registry.init_registry()
+    assert built == [("A2", True), ("B0", True)]
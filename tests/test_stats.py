@@ -0,0 +1,57 @@
+"""Test registry stats listener."""
+
+import json
+
+import pytest
+
+from extendable.registry import ExtendableClassesRegistry
+from extendable.stats import RegistryStatsListener
+
+
+@pytest.fixture
+def stats_listener():
+    listener = RegistryStatsListener()
+    listeners = ExtendableClassesRegistry.listeners
+    ExtendableClassesRegistry.listeners = listeners + [listener]
+    try:
+        yield listener
+    finally:
+        ExtendableClassesRegistry.listeners = listeners
+
+
+def test_registry_stats(test_registry, sys_modules_cleanup, stats_listener):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+
+    test_registry.init_registry(["tests.mod_base.*", "tests.mod_ext1.*"])
+    stats = stats_listener.get_stats(test_registry)
+    assert stats.modules_resolved == ["tests.mod_base.base", "tests.mod_ext1.base"]
+    assert set(stats.phases) == {"resolve", "load", "build", "init"}
+    assert stats.phases["init"] >= stats.phases["build"]
+    assert stats.modules["tests.mod_ext1.base"].class_names == [Base.__xreg_name__]
+    class_stats = stats.classes[Base.__xreg_name__]
+    assert class_stats.levels == 2
+    assert class_stats.new_classes == 2
+    assert stats.new_classes == 2
+    assert stats.slowest_classes(1) == [class_stats]
+    # the stats can be exported
+    assert json.loads(json.dumps(stats.as_dict()))["new_classes"] == 2
+
+
+def test_registry_stats_reset(test_registry, sys_modules_cleanup, stats_listener):
+    from tests.mod_base.base import Base  # NOQA isort:skip
+    import tests.mod_ext1  # NOQA isort:skip
+
+    test_registry.init_registry(["tests.mod_base.*"])
+    stats = stats_listener.get_stats(test_registry)
+    assert list(stats.classes) == [Base.__xreg_name__]
+    test_registry.load_modules(["tests.mod_ext1.*"])
+    # the stats of the loaded modules are added to the initialization ones
+    assert stats_listener.get_stats(test_registry) is stats
+    assert stats.classes[Base.__xreg_name__].levels == 2
+    assert set(stats.modules) == {"tests.mod_base.base", "tests.mod_ext1.base"}
+    # the stats are reset when the registry is initialized
+    registry = ExtendableClassesRegistry()
+    registry.init_registry(["tests.mod_base.*"])
+    assert stats_listener.get_stats(registry) is not stats
+    assert stats_listener.get_stats(registry).classes[Base.__xreg_name__].levels == 1
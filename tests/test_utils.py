@@ -0,0 +1,34 @@
+"""Test utilities."""
+
+from extendable.utils import ModuleIndex
+
+
+def test_module_index_get_modules():
+    idx = ModuleIndex(["pkg.b", "pkg.a", "pkg", "pkg_other", "other.pkg"])
+    assert idx.get_modules("pkg") == ["pkg"]
+    assert idx.get_modules("pkg.c") == []
+    # modules are returned in the order they were added
+    assert idx.get_modules("pkg.*") == ["pkg.b", "pkg.a"]
+    assert idx.get_modules("pkg*") == ["pkg.b", "pkg.a", "pkg", "pkg_other"]
+    assert idx.get_modules("*.pkg") == ["other.pkg"]
+    assert idx.get_modules("*") == ["pkg.b", "pkg.a", "pkg", "pkg_other", "other.pkg"]
+
+
+def test_module_index_incremental():
+    idx = ModuleIndex(["pkg.b"])
+    idx.add("pkg.a")
+    idx.add("pkg.b")
+    assert list(idx) == ["pkg.b", "pkg.a"]
+    assert idx.get_modules("pkg.*") == ["pkg.b", "pkg.a"]
+
+
+def test_module_index_resolve():
+    idx = ModuleIndex(["pkg.b", "pkg.a", "pkg.a.c", "other"])
+    assert idx.resolve(["other", "pkg.*", "pkg.a.*"]) == [
+        "other",
+        "pkg.b",
+        "pkg.a",
+        "pkg.a.c",
+    ]
+    assert idx.resolve(["pkg.*", "!pkg.a*"]) == ["pkg.b"]
+    assert idx.resolve(["!pkg.b", "*"]) == ["pkg.a", "pkg.a.c", "other"]